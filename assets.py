@@ -0,0 +1,128 @@
+import os
+import time
+import hashlib
+import threading
+
+import pygame
+
+# --- โหลดไฟล์เสียงเบื้องหลัง ---
+# ถอดรหัสเสียง (โดยเฉพาะ mp3) บนเธรดแยก หน้าต่างกับเมนูจะได้ขึ้นทันทีไม่ต้องรอ
+# ระหว่างที่ยังโหลดไม่เสร็จ get() คืน None = เงียบไปก่อน (โค้ดเกมเช็ค None อยู่แล้ว)
+#
+# เสียงเอฟเฟกต์ที่ถอดรหัสแล้วเก็บเป็น PCM ดิบลงดิสก์ คีย์ด้วยแฮชของไฟล์ต้นฉบับ
+# และรูปแบบ mixer (sample rate / bit / channel) เปิดเกมครั้งต่อไปจึงอ่าน PCM ตรง ๆ ไม่ต้องถอดรหัสอีก
+
+CACHE_DIR = "cute_shooter_cache"
+
+PENDING = "pending"
+READY = "ready"
+MISSING = "missing"
+
+
+def file_hash(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class AssetLoader:
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.jobs = []
+        self.status = {}   # ชื่อ -> PENDING / READY / MISSING
+        self.sounds = {}
+        self.timings = {}  # ชื่อ -> (วินาที, มาจากแคชไหม)
+        self.thread = None
+
+    # --- สั่งโหลด (เรียกก่อน start) ---
+    def add_sound(self, name, path, volume=1.0):
+        self.jobs.append((name, path, volume, False))
+        self.status[name] = PENDING
+
+    def add_music(self, name, path, volume=1.0):
+        # เพลงพื้นหลังเป็นแบบ stream อยู่แล้ว แค่เปิดไฟล์ ไม่ต้องแคช
+        self.jobs.append((name, path, volume, True))
+        self.status[name] = PENDING
+
+    def start(self):
+        self.thread = threading.Thread(target=self._work, name="asset-loader", daemon=True)
+        self.thread.start()
+
+    def wait(self, timeout=None):
+        if self.thread is not None:
+            self.thread.join(timeout)
+        return self.done()
+
+    # --- ถามสถานะ (เรียกจากเธรดหลักได้ทุกเมื่อ) ---
+    def get(self, name):
+        return self.sounds.get(name)
+
+    def ready(self, name):
+        return self.status.get(name) == READY
+
+    def done(self):
+        return all(s != PENDING for s in self.status.values())
+
+    def progress(self):
+        finished = sum(1 for s in self.status.values() if s != PENDING)
+        return finished, len(self.status)
+
+    # --- เธรดโหลด ---
+    def _work(self):
+        for name, path, volume, music in self.jobs:
+            start = time.perf_counter()
+            cached = False
+            try:
+                if music:
+                    pygame.mixer.music.load(path)
+                    pygame.mixer.music.set_volume(volume)
+                else:
+                    snd, cached = self.load_sound(path)
+                    snd.set_volume(volume)
+                    self.sounds[name] = snd
+                self.timings[name] = (time.perf_counter() - start, cached)
+                self.status[name] = READY
+                print(f"โหลด {path} สำเร็จ" + (" (จากแคช)" if cached else ""))
+            except Exception as e:
+                print(f"ไม่พบ {path}:", e)
+                self.status[name] = MISSING
+
+    def cache_path(self, path):
+        fmt = pygame.mixer.get_init()
+        if fmt is None:
+            return None
+        freq, size, channels = fmt
+        base = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(self.cache_dir, f"{base}-{file_hash(path)[:16]}-{freq}_{size}_{channels}.pcm")
+
+    def load_sound(self, path):
+        # คืน (Sound, มาจากแคชไหม)
+        cache = self.cache_path(path)
+        if cache and os.path.exists(cache):
+            try:
+                with open(cache, "rb") as f:
+                    return pygame.mixer.Sound(buffer=f.read()), True
+            except Exception:
+                pass
+        snd = pygame.mixer.Sound(path)
+        if cache:
+            self.store(cache, snd.get_raw())
+        return snd, False
+
+    def store(self, cache, raw):
+        # เขียนไฟล์ชั่วคราวแล้ว rename ทับ ถ้าเกมปิดกลางทางจะไม่เหลือไฟล์แคชครึ่ง ๆ
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            base = os.path.basename(cache).rsplit("-", 2)[0]
+            for old in os.listdir(self.cache_dir):
+                # แคชเก่าของไฟล์เดียวกัน (ไฟล์เสียงถูกแก้หรือ mixer เปลี่ยนรูปแบบ) ลบทิ้ง
+                if old.endswith(".pcm") and old.rsplit("-", 2)[0] == base:
+                    os.remove(os.path.join(self.cache_dir, old))
+            tmp = cache + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(raw)
+            os.replace(tmp, cache)
+        except OSError as e:
+            print("เขียนแคชเสียงไม่ได้:", e)
@@ -0,0 +1,103 @@
+import math
+import time
+
+import pygame
+
+# --- ตัวจัดการเสียงเอฟเฟกต์ (voice manager) ---
+# เกมไม่เรียก Sound.play() เองอีกแล้ว ทุกเสียงผ่าน play(ชื่อ) ที่นี่
+# - แต่ละหมวดมีช่องเสียง (Channel) ของตัวเอง ยิงรัว ๆ จะไม่แย่งช่องเสียงเก็บไอเทม
+# - เรียก play ชื่อเดิมหลายครั้งในเฟรมเดียว (ระเบิดพร้อมกันหลายตัว) รวมเป็นเสียงเดียวที่ดังขึ้นหน่อย
+# - แต่ละเสียงเล่นซ้อนกันได้ไม่เกิน max_voices ครบแล้วตัดตัวที่เก่าสุดของเสียงเดียวกัน
+# - หมวดเต็ม: แย่งช่องจากเสียงที่ priority ต่ำกว่าหรือเท่ากัน (เก่าสุดก่อน) ไม่มีให้แย่งก็ไม่เล่น
+# ยังไม่ได้ open() (headless / mixer เปิดไม่ได้) play() เงียบเฉย ๆ ไม่ต้องเช็คอะไรฝั่งเกม
+
+MERGE_GAIN = 0.5  # ดังขึ้นเท่าไหร่ต่อจำนวนครั้งที่รวมเพิ่มเท่าตัว
+
+
+class VoiceManager:
+    def __init__(self, categories):
+        # categories = {หมวด: จำนวนช่อง}
+        self.categories = dict(categories)
+        self.defs = {}      # ชื่อ -> (หมวด, priority, max_voices, volume)
+        self.sounds = {}    # ชื่อ -> Sound (มาทีหลังตอนโหลดเสร็จ)
+        self.channels = {}  # หมวด -> [index ช่อง]
+        self.voices = {}    # index ช่อง -> (ชื่อ, priority, เวลาเริ่ม)
+        self.pending = {}   # ชื่อ -> จำนวนครั้งที่สั่งในเฟรมนี้
+        self.stats = {"played": 0, "merged": 0, "stolen": 0, "dropped": 0}
+
+    def define(self, name, category, priority=1, max_voices=2, volume=1.0):
+        self.defs[name] = (category, priority, max_voices, volume)
+
+    def open(self):
+        # จองช่องของ mixer ทั้งหมดไว้ใช้เอง (Sound.play() ลอย ๆ จะไม่มาแย่ง)
+        if not pygame.mixer.get_init():
+            return False
+        total = sum(self.categories.values())
+        pygame.mixer.set_num_channels(total)
+        pygame.mixer.set_reserved(total)
+        start = 0
+        for category, count in self.categories.items():
+            self.channels[category] = list(range(start, start + count))
+            start += count
+        return True
+
+    def set_sound(self, name, sound):
+        # ความดังพื้นฐานคุมที่ช่องเสียง ตัวเสียงเองเปิดเต็ม
+        if sound is None or name in self.sounds:
+            return
+        sound.set_volume(1.0)
+        self.sounds[name] = sound
+
+    def has(self, name):
+        return name in self.sounds
+
+    def play(self, name):
+        # แค่จดไว้ เล่นจริงตอน flush() ท้ายเฟรม
+        if name in self.sounds and self.channels:
+            self.pending[name] = self.pending.get(name, 0) + 1
+
+    def flush(self):
+        # เรียกเฟรมละครั้ง ; เสียงสำคัญกว่าได้เลือกช่องก่อน
+        if not self.pending:
+            return
+        now = time.perf_counter()
+        order = sorted(self.pending.items(), key=lambda kv: -self.defs[kv[0]][1])
+        self.pending.clear()
+        for name, count in order:
+            self.stats["merged"] += count - 1
+            category, priority, max_voices, volume = self.defs[name]
+            index = self.pick_channel(name, category, priority, max_voices)
+            if index is None:
+                self.stats["dropped"] += 1
+                continue
+            channel = pygame.mixer.Channel(index)
+            channel.set_volume(min(1.0, volume * (1 + MERGE_GAIN * math.log2(count))))
+            channel.play(self.sounds[name])
+            self.voices[index] = (name, priority, now)
+            self.stats["played"] += 1
+
+    def pick_channel(self, name, category, priority, max_voices):
+        free, same, others = None, [], []
+        for index in self.channels[category]:
+            voice = self.voices.get(index)
+            if voice is None or not pygame.mixer.Channel(index).get_busy():
+                self.voices.pop(index, None)
+                if free is None:
+                    free = index
+            elif voice[0] == name:
+                same.append((voice[2], index))
+            elif voice[1] <= priority:
+                others.append((voice[1], voice[2], index))
+        if len(same) >= max_voices:
+            # เสียงนี้เล่นซ้อนครบแล้ว เริ่มตัวที่เก่าสุดใหม่
+            self.stats["stolen"] += 1
+            return min(same)[1]
+        if free is not None:
+            return free
+        if others:
+            self.stats["stolen"] += 1
+            return min(others)[2]
+        if same:
+            self.stats["stolen"] += 1
+            return min(same)[1]
+        return None
@@ -0,0 +1,222 @@
+import os
+import sys
+import csv
+import math
+import time
+import itertools
+import argparse
+import multiprocessing
+
+import numpy as np
+
+import cute_shooter as cs
+
+# --- จำลองเกมจำนวนมากพร้อมกันหลายโปรเซส (ไว้จูนความยาก) ---
+# ให้บอทเล่นเกม headless หลายพันรอบ กระจายไปทุกคอร์ แล้วเขียนผลทีละรอบลง CSV
+# ทุกชุดค่าที่กวาดใช้ seed ชุดเดียวกัน ผลต่างระหว่างชุดจึงมาจากค่าที่ปรับจริง ๆ
+#
+#   python batch_sim.py --games 2000 -o runs.csv
+#   python batch_sim.py --games 500 --sweep spawn_cd_min=8,12,16 --sweep drop_rate=0.1,0.15,0.25
+#
+# ชื่อที่กวาดได้คือ field ของ cs.Balance
+
+LOOKAHEAD = 0.8   # วินาที มองศัตรูที่จะถึงแนวผู้เล่นภายในเวลานี้
+SAFE_GAP = 12     # px เผื่อจากขอบตัว
+HOME_Y = cs.HEIGHT - 60
+
+
+# --- บอทเล่นเกม ---
+class Autopilot:
+    # ตัดสินใจใหม่ทุก reaction วินาที ระหว่างนั้นกดค้างแบบเดิม (คนจริงก็ตอบสนองช้าแบบนี้)
+    # ไม่แตะตัวสุ่มของเกม ผลจึงขึ้นกับ seed กับค่าสมดุลอย่างเดียว
+    def __init__(self, reaction=0.2, sim_hz=cs.SIM_HZ):
+        self.every = max(1, round(reaction * sim_hz))
+        self.inp = cs.NO_INPUT
+
+    def __call__(self, game):
+        if game.ticks % self.every == 0:
+            self.inp = autopilot(game)
+        return self.inp
+
+
+def autopilot(game):
+    # หลบศัตรูที่กำลังจะตกใส่ เก็บไอเทมที่อยู่ใกล้ แล้วเลื่อนไปใต้ศัตรูที่ยิงได้ ยิงตลอด
+    p = game.player
+    enemies, powerups = game.enemies, game.powerups
+    n = len(enemies)
+    x, y = enemies.x[:n], enemies.y[:n]
+    vx, vy, r = enemies.vx[:n], enemies.vy[:n], enemies.radius[:n]
+    dodge = 0.0
+    target = None
+    ahead = np.flatnonzero(p.y - y >= -r)  # ยังไม่ผ่านแนวผู้เล่น
+    if ahead.size:
+        dy = np.maximum(p.y - y[ahead], 0.0)
+        with np.errstate(divide="ignore"):
+            t = np.where(vy[ahead] > 0, dy / vy[ahead], LOOKAHEAD)
+        gap = x[ahead] + vx[ahead] * t - p.x
+        danger = (t < LOOKAHEAD) & (np.abs(gap) < r[ahead] + p.radius + SAFE_GAP)
+        # ยิ่งใกล้ยิ่งต้องรีบหลบ
+        dodge = float(np.sum(np.where(gap[danger] > 0, -1.0, 1.0) * (1.2 - t[danger] / LOOKAHEAD)))
+        # เป้าหมาย: ศัตรูที่อยู่ต่ำสุด (ใกล้ถึงตัวที่สุด)
+        target = int(ahead[np.argmax(y[ahead])])
+
+    if dodge and (p.x < 60 and dodge < 0 or p.x > cs.WIDTH - 60 and dodge > 0):
+        dodge = -dodge  # ติดขอบจอ หลบอีกทาง
+    if dodge:
+        goal_x = p.x + (40 if dodge > 0 else -40)
+    else:
+        goal_x = p.x
+        below = np.flatnonzero(powerups.y[:len(powerups)] < p.y)
+        if below.size:
+            goal_x = powerups.x[below[0]]
+        elif target is not None:
+            goal_x = x[target]
+
+    inp = cs.InputState(
+        left=goal_x < p.x - 4,
+        right=goal_x > p.x + 4,
+        up=p.y > HOME_Y + 4,
+        down=p.y < HOME_Y - 4,
+    )
+    if target is not None:
+        # เล็งดักหน้าศัตรูตามเวลาที่กระสุนบินไปถึง
+        tx, ty = x[target], y[target]
+        t = math.hypot(tx - p.x, ty - p.y) / 540
+        inp.fire = True
+        inp.aim = (float(tx + vx[target] * t), float(ty + vy[target] * t))
+    else:
+        inp.fire_up = True
+    return inp
+
+
+# --- รันหนึ่งเกม (ในโปรเซสลูก) ---
+def run_one(job):
+    index, seed, params, max_ticks, reaction = job
+    game = cs.Game(seed=seed, headless=True, balance=cs.Balance(**params))
+    game.start()
+    policy = Autopilot(reaction, game.sim_hz)
+    hits = 0
+    hp = game.player.hp
+    while game.ticks < max_ticks:
+        state = game.step(policy(game))
+        if game.player.hp < hp:
+            hits += hp - game.player.hp
+        hp = game.player.hp
+        if state != "playing":
+            break
+    died = game.state == "gameover"
+    row = {"run": index, "seed": seed}
+    row.update(params)
+    row.update({
+        "score": game.score,
+        "level": game.level,
+        "seconds": round(game.time_played, 3),
+        "ticks": game.ticks,
+        "outcome": "died" if died else "timeout",
+        # ตอนนี้ผู้เล่นเสียเลือดได้ทางเดียวคือโดนศัตรูชน
+        "cause": "enemy_collision" if died else "",
+        "hits": hits,
+        "hp_left": game.player.hp,
+    })
+    return row
+
+
+def parse_value(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def parse_sweeps(specs):
+    # ["spawn_cd_min=8,12", "drop_rate=0.1,0.2"] -> [{...}, {...}, ...] ทุกการจับคู่
+    names, choices = [], []
+    defaults = cs.Balance().items()
+    for spec in specs or []:
+        name, _, values = spec.partition("=")
+        name = name.strip()
+        if name not in defaults:
+            raise SystemExit(f"ไม่มีค่าสมดุลชื่อ {name} (มี: {', '.join(defaults)})")
+        names.append(name)
+        choices.append([parse_value(v) for v in values.split(",") if v.strip()])
+    return [dict(zip(names, combo)) for combo in itertools.product(*choices)]
+
+
+def make_jobs(param_sets, games, base_seed, max_ticks, reaction):
+    index = 0
+    for params in param_sets:
+        for i in range(games):
+            yield index, base_seed + i, params, max_ticks, reaction
+            index += 1
+
+
+def summarize(rows, names):
+    # ค่าเฉลี่ยต่อชุดค่า
+    groups = {}
+    for row in rows:
+        key = tuple(row[n] for n in names)
+        groups.setdefault(key, []).append(row)
+    for key, group in sorted(groups.items()):
+        n = len(group)
+        label = "  ".join(f"{name}={value}" for name, value in zip(names, key)) or "ค่าเริ่มต้น"
+        score = sum(r["score"] for r in group) / n
+        level = sum(r["level"] for r in group) / n
+        seconds = sum(r["seconds"] for r in group) / n
+        died = sum(1 for r in group if r["outcome"] == "died") / n
+        print(f"{label:<40} {n:>5} เกม  คะแนน {score:8.1f}  เลเวล {level:5.2f}  "
+              f"อยู่รอด {seconds:7.1f} s  ตาย {died*100:5.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cute Shooter batch simulator")
+    parser.add_argument("--games", type=int, default=200, help="จำนวนเกมต่อหนึ่งชุดค่า")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=1, help="seed ของเกมแรก (เกมถัดไป +1)")
+    parser.add_argument("--max-seconds", type=float, default=600.0,
+                        help="เวลาในเกมสูงสุดต่อรอบ เกินนี้นับว่ารอด (timeout)")
+    parser.add_argument("--reaction", type=float, default=0.2,
+                        help="เวลาตอบสนองของบอท (วินาที) มากขึ้น = เล่นแย่ลง")
+    parser.add_argument("--sweep", action="append", metavar="NAME=V1,V2,...",
+                        help="กวาดค่าสมดุล ใส่ซ้ำได้ จะรันทุกการจับคู่")
+    parser.add_argument("-o", "--output", help="ไฟล์ CSV ผลรายเกม")
+    args = parser.parse_args(argv)
+
+    param_sets = parse_sweeps(args.sweep)
+    names = list(param_sets[0])
+    max_ticks = int(args.max_seconds * cs.SIM_HZ)
+    total = len(param_sets) * args.games
+    fields = ["run", "seed"] + names + ["score", "level", "seconds", "ticks",
+                                        "outcome", "cause", "hits", "hp_left"]
+
+    out = writer = None
+    if args.output:
+        out = open(args.output, "w", newline="", encoding="utf-8")
+        writer = csv.DictWriter(out, fieldnames=fields)
+        writer.writeheader()
+
+    rows = []
+    start = time.perf_counter()
+    jobs = make_jobs(param_sets, args.games, args.seed, max_ticks, args.reaction)
+    chunk = max(1, min(16, total // (args.workers * 8)))
+    try:
+        with multiprocessing.Pool(args.workers) as pool:
+            # ผลมาไม่เรียงลำดับ เขียนทันทีที่ได้ จะได้ไม่ต้องรอทั้งชุด
+            for done, row in enumerate(pool.imap_unordered(run_one, jobs, chunk), 1):
+                rows.append(row)
+                if writer:
+                    writer.writerow(row)
+                if done % 100 == 0 or done == total:
+                    rate = done / (time.perf_counter() - start)
+                    print(f"\r{done}/{total} เกม  {rate:.1f} เกม/วินาที", end="", file=sys.stderr)
+    finally:
+        if out:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(file=sys.stderr)
+    summarize(rows, names)
+    print(f"รวม {total} เกมใน {elapsed:.1f} s ({total / elapsed:.1f} เกม/วินาที, {args.workers} โปรเซส)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,376 @@
+import os
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+
+# รันได้บนเครื่อง build ที่ไม่มีจอ: ใช้ไดรเวอร์ dummy ของ SDL ถ้าไม่ได้ตั้งไว้เอง
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+import cute_shooter as cs
+from quality import tier_index
+from pipeline import Pipeline
+
+# --- ชุดวัดประสิทธิภาพ ---
+# ขับ Game ผ่านสถานการณ์จำลองที่กำหนด seed ไว้ (ไม่มีคนกด) แล้วจับเวลาแยกตามช่วง
+# ของเฟรม เขียนผลเป็น JSON ไว้เทียบกับ baseline ที่เก็บไว้ได้
+#
+#   python bench.py                         # รันทุกสถานการณ์ พิมพ์สรุป
+#   python bench.py -o bench.json           # เขียนผลเป็นไฟล์
+#   python bench.py --baseline base.json    # เทียบกับผลเก่า ช้าลงเกินกำหนด = exit 1
+#   python bench.py --pipeline              # จำลองบนอีกเธรดซ้อนกับการวาด (ดู pipeline.py) เทียบกับแบบปกติ
+
+PHASES = ["movement", "spawn", "collision", "particles", "draw", "flip"]
+# โหมด pipeline: ช่วงจำลองเกิดบนเธรดจำลอง (ซ้อนกับ draw/flip) เพิ่มเวลาถ่ายสำเนาและเวลาที่เธรดหลักรอ
+PIPELINE_PHASES = ["capture", "wait"]
+
+
+# --- สถานการณ์ ---
+# แต่ละอันมี setup(game, rng) และ tick(game, rng) ที่เรียกทุกเฟรมในช่วง "spawn"
+# คืน InputState ของเฟรมนั้น (หรือ None ถ้าไม่กดอะไร)
+
+def keep_alive(game):
+    # สถานการณ์วัดผลต้องไม่จบเกมกลางทาง
+    game.player.hp = 3
+
+
+def spawn_enemy_on_screen(game, rng):
+    i = game.enemies.spawn(game.level, game.rng, game.balance)
+    game.enemies.y[i] = game.enemies.py[i] = rng.uniform(-20, cs.HEIGHT - 100)
+
+
+class EnemySwarm:
+    name = "enemies_500_triple"
+    description = "ศัตรู 500 ตัว ผู้เล่นกดยิงสามทางค้างไว้"
+    ui = "playing"
+
+    def setup(self, game, rng):
+        for _ in range(500):
+            spawn_enemy_on_screen(game, rng)
+
+    def tick(self, game, rng):
+        keep_alive(game)
+        game.player.power_triple = 8.0
+        while len(game.enemies) < 500:
+            spawn_enemy_on_screen(game, rng)
+        return cs.InputState(fire_up=True)
+
+
+class BulletStorm:
+    name = "bullets_5k"
+    description = "กระสุนบนจอ 5,000 นัด"
+    ui = "playing"
+
+    def setup(self, game, rng):
+        self.tick(game, rng)
+
+    def tick(self, game, rng):
+        keep_alive(game)
+        missing = 5000 - len(game.bullets)
+        for _ in range(missing):
+            x = rng.uniform(0, cs.WIDTH)
+            y = rng.uniform(0, cs.HEIGHT)
+            game.bullets.spawn(x, y, rng.uniform(0, 360), rng.uniform(60, 240))
+        return None
+
+
+class BulletHell:
+    name = "bullet_hell"
+    description = "ศัตรู 2,000 ตัวกับกระสุน 3,000 นัดบนจอพร้อมกัน"
+    ui = "playing"
+
+    def setup(self, game, rng):
+        self.tick(game, rng)
+
+    def tick(self, game, rng):
+        keep_alive(game)
+        while len(game.enemies) < 2000:
+            spawn_enemy_on_screen(game, rng)
+        for _ in range(3000 - len(game.bullets)):
+            game.bullets.spawn(rng.uniform(0, cs.WIDTH), rng.uniform(0, cs.HEIGHT),
+                               rng.uniform(0, 360), rng.uniform(60, 240))
+        return None
+
+
+class MassExplosions:
+    name = "particles_20k"
+    description = "พาร์ติเคิล 20,000 ตัวจากการระเบิดพร้อมกัน"
+    ui = "playing"
+
+    def setup(self, game, rng):
+        self.tick(game, rng)
+
+    def tick(self, game, rng):
+        keep_alive(game)
+        colors = cs.ENEMY_COLORS
+        while len(game.particles) < 20000:
+            game.particles.emit(rng.uniform(0, cs.WIDTH), rng.uniform(0, cs.HEIGHT),
+                                colors[rng.randrange(len(colors))], 20)
+        return None
+
+
+class TextHeavy:
+    name = "menu_hud_text"
+    description = "เมนู หน้าจบเกม และ HUD ที่ตัวเลขเปลี่ยนทุกเฟรม"
+    ui = "text"
+
+    def setup(self, game, rng):
+        game.player.power_triple = 8.0
+
+    def tick(self, game, rng):
+        keep_alive(game)
+        game.score += 10
+        return None
+
+
+SCENARIOS = [EnemySwarm, BulletStorm, BulletHell, MassExplosions, TextHeavy]
+
+
+# --- ตัววัด ---
+def summarize(samples):
+    a = np.asarray(samples, dtype=np.float64) * 1000.0
+    if a.size == 0:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    return {
+        "mean": round(float(a.mean()), 4),
+        "p50": round(float(np.percentile(a, 50)), 4),
+        "p95": round(float(np.percentile(a, 95)), 4),
+        "max": round(float(a.max()), 4),
+    }
+
+
+def peak_rss_kb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS รายงานเป็นไบต์ ลินุกซ์เป็นกิโลไบต์
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def simulate_tick(view, game, inp, out):
+    # หนึ่งรอบจำลองแบบเดียวกับใน run_scenario (รันบนเธรดจำลอง) ; เวลาแต่ละช่วงเขียนลง out
+    clock = time.perf_counter
+    t1 = clock()
+    game.update_movement(inp)
+    t2 = clock()
+    game.update_spawn()
+    t3 = clock()
+    game.update_collisions()
+    t4 = clock()
+    game.update_particles()
+    game.update_gameover()
+    game.time_played += game.dt
+    game.ticks += 1
+    t5 = clock()
+    view.capture(game, 1.0)
+    out[:] = [t1, t2, t3, t4, t5, clock()]
+
+
+def run_scenario(scenario, screen, frames=600, warmup=60, seed=1234, trace_memory=False, quality=0,
+                 pipeline=False):
+    rng = random.Random(seed)
+    game = cs.Game(seed=seed, headless=True)
+    # ล็อกระดับคุณภาพ ผลแต่ละรอบจะได้เทียบกันได้
+    game.quality.pin(quality)
+    game.start()
+    scenario.setup(game, rng)
+    pipe = None
+    if pipeline and scenario.ui == "playing":
+        pipe = Pipeline(cs.WorldView(), cs.WorldView())
+        sim = []
+    timings = {phase: [] for phase in PHASES + (PIPELINE_PHASES if pipe else [])}
+    frame_times = []
+    clock = time.perf_counter
+
+    if trace_memory:
+        import tracemalloc
+        tracemalloc.start()
+
+    for i in range(warmup + frames):
+        t0 = clock()
+        if pipe is not None:
+            # เฟรมนี้วาดผลของรอบก่อน ระหว่างที่เธรดจำลองเดินรอบนี้
+            if pipe.wait() is None:
+                pipe.front.capture(game, 1.0)
+            else:
+                pipe.front.follow(pipe.back)
+            tw = clock()
+            inp = scenario.tick(game, rng) or cs.NO_INPUT
+            ts = clock()
+            last = list(sim)  # เวลาของรอบจำลองที่เพิ่งเสร็จ
+            pipe.submit(simulate_tick, game, inp, sim)
+            game.draw_frame(screen, 1.0, pipe.front)
+            t6 = clock()
+            pygame.display.flip()
+            t7 = clock()
+            if i < warmup or not last:
+                continue
+            t1, t2, t3, t4, t5, tc = last
+            timings["movement"].append(t2 - t1)
+            timings["spawn"].append((t3 - t2) + (ts - tw))
+            timings["collision"].append(t4 - t3)
+            timings["particles"].append(t5 - t4)
+            timings["capture"].append(tc - t5)
+            timings["wait"].append(tw - t0)
+            timings["draw"].append(t6 - ts)
+            timings["flip"].append(t7 - t6)
+            frame_times.append(t7 - t0)
+            continue
+        inp = scenario.tick(game, rng) or cs.NO_INPUT
+        if scenario.ui == "playing":
+            t1 = clock()
+            game.update_movement(inp)
+            t2 = clock()
+            game.update_spawn()
+            t3 = clock()
+            game.update_collisions()
+            t4 = clock()
+            game.update_particles()
+            game.update_gameover()
+            game.time_played += game.dt
+            game.ticks += 1
+            t5 = clock()
+            game.draw_playing(screen)
+        else:
+            t1 = t2 = t3 = t4 = t5 = clock()
+            game.draw_menu(screen)
+            game.draw_gameover(screen)
+            game.draw_playing(screen)
+        t6 = clock()
+        pygame.display.flip()
+        t7 = clock()
+        if i < warmup:
+            continue
+        # เวลาของ tick() สถานการณ์นับรวมเป็นช่วง spawn
+        timings["movement"].append(t2 - t1)
+        timings["spawn"].append((t3 - t2) + (t1 - t0))
+        timings["collision"].append(t4 - t3)
+        timings["particles"].append(t5 - t4)
+        timings["draw"].append(t6 - t5)
+        timings["flip"].append(t7 - t6)
+        frame_times.append(t7 - t0)
+    if pipe is not None:
+        pipe.close()
+
+    result = {
+        "description": scenario.description,
+        "frames": frames,
+        "fps": round(frames / sum(frame_times), 2) if frame_times else 0.0,
+        "frame_ms": summarize(frame_times),
+        "phases_ms": {phase: summarize(samples) for phase, samples in timings.items()},
+        "entities": {
+            "enemies": len(game.enemies),
+            "bullets": len(game.bullets),
+            "powerups": len(game.powerups),
+            "particles": len(game.particles),
+        },
+        "peak_rss_kb": peak_rss_kb(),
+    }
+    if trace_memory:
+        import tracemalloc
+        result["peak_traced_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+    return result
+
+
+def run_all(names=None, frames=600, warmup=60, seed=1234, trace_memory=False, quality=0, pipeline=False):
+    screen = cs.init_display()
+    cs.prebake_sprites()
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "video_driver": pygame.display.get_driver(),
+            "seed": seed,
+            "quality": quality,
+            "pipeline": pipeline,
+        },
+        "scenarios": {},
+    }
+    for cls in SCENARIOS:
+        if names and cls.name not in names:
+            continue
+        report["scenarios"][cls.name] = run_scenario(cls(), screen, frames, warmup, seed, trace_memory,
+                                                       quality, pipeline)
+    return report
+
+
+def compare(report, baseline, tolerance=0.10):
+    # คืนลิสต์ข้อความของสถานการณ์ที่ช้าลงเกิน tolerance (เทียบเวลาเฉลี่ยต่อเฟรม)
+    regressions = []
+    for name, cur in report["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if old is None:
+            continue
+        before, after = old["frame_ms"]["mean"], cur["frame_ms"]["mean"]
+        change = (after - before) / before if before else 0.0
+        cur["vs_baseline"] = round(change, 4)
+        if change > tolerance:
+            regressions.append(f"{name}: {before:.3f} ms -> {after:.3f} ms (+{change*100:.1f}%)")
+    return regressions
+
+
+def print_report(report):
+    for name, r in report["scenarios"].items():
+        line = f"{name:<20} {r['fps']:>9.1f} fps  frame {r['frame_ms']['mean']:.3f} ms (p95 {r['frame_ms']['p95']:.3f})"
+        if "vs_baseline" in r:
+            line += f"  {r['vs_baseline']*100:+.1f}% vs baseline"
+        print(line)
+        print("    " + "  ".join(f"{p} {r['phases_ms'][p]['mean']:.3f}" for p in PHASES))
+        if "wait" in r["phases_ms"]:
+            print("    " + "  ".join(f"{p} {r['phases_ms'][p]['mean']:.3f}" for p in PIPELINE_PHASES))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cute Shooter benchmark")
+    parser.add_argument("-o", "--output", help="ไฟล์ JSON ที่จะเขียนผล")
+    parser.add_argument("--baseline", help="ไฟล์ JSON ผลเก่าไว้เทียบ")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="ช้าลงได้ไม่เกินสัดส่วนนี้ก่อนนับว่าถดถอย (ค่าเริ่มต้น 0.10)")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--warmup", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--scenario", action="append",
+                        help="รันเฉพาะสถานการณ์นี้ (ใส่ซ้ำได้): " + ", ".join(c.name for c in SCENARIOS))
+    parser.add_argument("--memory", action="store_true",
+                        help="วัดหน่วยความจำสูงสุดด้วย tracemalloc (ช้าลง)")
+    parser.add_argument("--quality", default="0", metavar="TIER",
+                        help="ระดับคุณภาพภาพที่ล็อกไว้ตอนวัด (0-3 หรือ high/medium/low/lowest, ค่าเริ่มต้น 0)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="จำลองบนอีกเธรดซ้อนกับการวาด (สถานการณ์ระหว่างเล่น) วัดว่าซ้อนกันได้แค่ไหน")
+    args = parser.parse_args(argv)
+    try:
+        quality = tier_index(args.quality)
+    except ValueError as e:
+        parser.error(str(e))
+
+    report = run_all(args.scenario, args.frames, args.warmup, args.seed, args.memory, quality, args.pipeline)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if regressions:
+        print("ช้าลงกว่า baseline:")
+        for line in regressions:
+            print("  " + line)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
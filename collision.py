@@ -0,0 +1,77 @@
+import numpy as np
+
+# --- ระบบชน (ทำงานบน array ของ EntityStore) ---
+# กระสุนกับศัตรูใช้ broadphase แบบตาราง: แบ่งจอเป็นช่องสี่เหลี่ยมเท่า ๆ กัน เรียงกระสุนตามช่อง
+# แล้วหาคู่ที่อยู่ช่องใกล้กันด้วย searchsorted แทนการเทียบทุกคู่ (enemies x bullets)
+# ไอเทมกับผู้เล่น และศัตรูกับผู้เล่น เป็นหนึ่งต่อหลาย เทียบทั้ง array ตรง ๆ เลย
+#
+# ทุก pass คืนผลตามลำดับเดียวกับลูปเดิมเป๊ะ (ลำดับศัตรู แล้วลำดับกระสุน)
+# เกมจึงเอาไปประมวลผลต่อได้โดยผลลัพธ์ (รวมถึงลำดับการสุ่ม) ไม่เปลี่ยน
+
+KEY_STRIDE = 1 << 20  # รวมเลขช่อง (x, y) เป็น key เดียว
+
+
+class CollisionSystem:
+    def __init__(self, cell=64):
+        self.cell = cell
+
+    def bullets_vs_enemies(self, bx, by, b_radius, ex, ey, er):
+        # bx, by = ตำแหน่งกระสุน ; ex, ey = rect.center ของศัตรู (ปัดเป็น int แบบเดิม) ; er = รัศมีศัตรู
+        # คืนลิสต์ (index กระสุน, index ศัตรู) ; กระสุนหนึ่งนัดโดนได้ศัตรูตัวเดียว (ตัวแรกตามลำดับ)
+        # ศัตรูโดนได้หลายนัด
+        nb, ne = bx.size, ex.size
+        if nb == 0 or ne == 0:
+            return []
+        cell = self.cell
+        keys = (by // cell).astype(np.int64) * KEY_STRIDE + (bx // cell).astype(np.int64)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+
+        r = er + b_radius
+        x0, x1 = (ex - r) // cell, (ex + r) // cell
+        y0, y1 = (ey - r) // cell, (ey + r) // cell
+        enemy_ids = np.arange(ne)
+        pair_e, pair_b = [], []
+        for dy in range(int((y1 - y0).max()) + 1):
+            for dx in range(int((x1 - x0).max()) + 1):
+                qx, qy = x0 + dx, y0 + dy
+                k = qy.astype(np.int64) * KEY_STRIDE + qx
+                lo = np.searchsorted(sorted_keys, k, "left")
+                hi = np.searchsorted(sorted_keys, k, "right")
+                counts = np.where((qx <= x1) & (qy <= y1), hi - lo, 0)
+                total = int(counts.sum())
+                if not total:
+                    continue
+                # กระจายช่วง [lo, hi) ของแต่ละศัตรูเป็นคู่ (ศัตรู, กระสุน)
+                starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+                pair_e.append(np.repeat(enemy_ids, counts))
+                pair_b.append(order[np.arange(total) + starts])
+        if not pair_e:
+            return []
+        pe = np.concatenate(pair_e)
+        pb = np.concatenate(pair_b)
+        hit = (ex[pe] - bx[pb])**2 + (ey[pe] - by[pb])**2 <= (er[pe] + b_radius)**2
+        pe, pb = pe[hit], pb[hit]
+        if pe.size == 0:
+            return []
+        o = np.lexsort((pb, pe))
+        pe, pb = pe[o], pb[o]
+        # กระสุนที่ทับหลายตัว นับเฉพาะศัตรูตัวแรก
+        _, first = np.unique(pb, return_index=True)
+        first.sort()
+        return list(zip(pb[first].tolist(), pe[first].tolist()))
+
+    def player_vs_powerups(self, rect, left, top, size):
+        # rect ชน rect แบบ pygame.Rect.colliderect ; คืน index ไอเทมที่โดน
+        if left.size == 0:
+            return []
+        hit = ((rect.left < left + size) & (left < rect.right)
+               & (rect.top < top + size) & (top < rect.bottom))
+        return np.flatnonzero(hit).tolist()
+
+    def enemies_vs_player(self, x, y, er, px, py, radius):
+        # วงกลมชนวงกลม ; คืน index ศัตรูที่โดน
+        if x.size == 0:
+            return []
+        hit = (x - px)**2 + (y - py)**2 <= (er + radius)**2
+        return np.flatnonzero(hit).tolist()
@@ -1,12 +1,43 @@
+import time
+IMPORT_START = time.perf_counter()
+
 import pygame
+PYGAME_IMPORTED = time.perf_counter()  # import pygame (พ่วง numpy มาด้วย) กินเวลาเปิดเกมเกือบทั้งหมด แยกไว้ดู
 import random
 import math
-import json
 import os
+import hashlib
+
+import numpy as np
+
+from collision import CollisionSystem
+from particles import ParticleSystem
+from text_cache import TextCache
+from sprite_atlas import SpriteAtlas
+from dirty_render import DirtyTiles
+from profiler import FrameProfiler, StartupTrace
+from assets import AssetLoader
+from audio import VoiceManager
+from quality import QualityGovernor
+from snapshot import save_state, load_state, RewindBuffer, SnapshotError
+from pacing import EventQueue, FramePacer, LatencyMeter, PACERS
+from pipeline import Pipeline
+from texture_render import TextureScreen
+from frame_capture import FrameCapture
+from entity_store import EntityStore, round_half_away
+from replay import ReplayWriter, ReplayReader, input_fields
+from save_store import SaveStore
+
+# จับเวลาเปิดเกมแต่ละช่วง (--startup-trace พิมพ์ตอนเฟรมแรกขึ้นจอ)
+STARTUP = StartupTrace(IMPORT_START)
+STARTUP.add("import pygame", PYGAME_IMPORTED - IMPORT_START)
 
 # --- ตั้งค่าเริ่มต้น ---
 WIDTH, HEIGHT = 900, 600
-FPS = 60
+FPS = 60       # เพดานเฟรมเรตของการวาด (0 = ไม่จำกัด)
+SIM_HZ = 60    # จำนวนรอบจำลองต่อวินาที (แยกจากเฟรมเรตการวาด)
+MAX_FRAME_TIME = 0.25  # เฟรมค้างนานกว่านี้ไม่ต้องไล่จำลองให้ทัน กันเกมค้างยาว
+TIMER_EPS = 1e-9
 
 # โทนสีพาสเทล
 PASTEL_BG = (250, 245, 255)
@@ -16,44 +47,135 @@ PASTEL_3 = (152, 251, 152)  # light green
 PASTEL_4 = (255, 228, 181)  # moccasin
 PASTEL_5 = (221, 160, 221)  # plum
 INK = (60, 60, 60)
+ENEMY_COLORS = [PASTEL_1, PASTEL_2, PASTEL_3, PASTEL_4, PASTEL_5]
+ENEMY_RADII = range(14, 25)
+POWERUP_KINDS = ['heart', 'triple']
 WHITE = (255, 255, 255)
 
-SAVE_FILE = "cute_shooter_save.json"
-
-# --- เตรียม mixer ก่อน init เพื่อลดดีเลย์ ---
-pygame.mixer.pre_init(44100, -16, 2, 512)
-pygame.init()
-try:
-    pygame.mixer.init()
-except Exception as e:
-    print("pygame.mixer.init() failed:", e)
+# พื้นที่ HUD (หัวใจซ้ายบน / คะแนนขวาบน) ใช้คืนพื้นหลังในโหมด dirty rect
+HUD_REGIONS = [pygame.Rect(0, 0, 160, 44), pygame.Rect(WIDTH-140, 0, 140, 112)]
+# กล่องสถิติของ profiler (กด F3)
+OVERLAY_RECT = pygame.Rect(14, HEIGHT-204, 300, 190)
+
+FONT_FILE = "THSarabunNew.ttf"
+TITLE = "Cute Shooter – เกมยิงปืนน่ารักๆ"
+# ตัววาด: "surface" = วาดลง Surface ของ display แล้ว flip (แบบเดิม), "texture" = ดู texture_render.py
+RENDERERS = ["surface", "texture"]
+QUICKSAVE_FILE = "cute_shooter_quicksave.bin"
+REWIND_SECONDS = 3.0  # กด R ย้อนเวลากี่วินาที
+
+# --- เสียงเอฟเฟกต์ ---
+# ช่องเสียงต่อหมวด (รวม 8 ช่องเท่าค่าเริ่มต้นของ mixer)
+SOUND_CHANNELS = {"shoot": 2, "impact": 4, "pickup": 2}
+# priority มาก = สำคัญกว่า ; volume = ความดังตอนเล่นครั้งเดียว
+SOUNDS = {
+    "shoot": dict(category="shoot", priority=1, max_voices=2, volume=0.45),
+    "explosion": dict(category="impact", priority=2, max_voices=3, volume=0.5),
+    "pickup": dict(category="pickup", priority=3, max_voices=2, volume=0.6),
+}
+
+
+# --- ค่าสมดุลความยาก ---
+# รวมตัวเลขที่ใช้จูนเกมไว้ที่เดียว ส่ง Balance(spawn_cd_min=10, ...) ให้ Game เพื่อลองค่าอื่น
+# (batch_sim.py ใช้กวาดค่าพวกนี้) ความเร็วเป็น px/วินาที ส่วนคูลดาวน์นับเป็นเฟรมที่ 60 FPS แบบเดิม
+class Balance:
+    def __init__(self, **overrides):
+        # ศัตรู: ความเร็วลง = enemy_speed + min(level * enemy_speed_per_level, enemy_speed_cap)
+        #        บวกสุ่มเพิ่มอีก 0..enemy_speed_spread
+        self.enemy_speed = 96
+        self.enemy_speed_per_level = 4.8
+        self.enemy_speed_cap = 180
+        self.enemy_speed_spread = 72
+        # คูลดาวน์เกิดศัตรู = max(spawn_cd_min, spawn_cd_start - int(level * spawn_cd_per_level)) เฟรม
+        self.spawn_cd_start = 45
+        self.spawn_cd_min = 12
+        self.spawn_cd_per_level = 1.7
+        self.level_every = 100   # เลเวลอัพทุก ๆ กี่คะแนน
+        self.drop_rate = 0.15    # โอกาสดรอปไอเทมเมื่อศัตรูตาย
+        for name, value in overrides.items():
+            if not hasattr(self, name):
+                raise TypeError(f"ไม่มีค่าสมดุลชื่อ {name}")
+            setattr(self, name, value)
+
+    def items(self):
+        return dict(vars(self))
+
+
+BALANCE = Balance()
+
+# import ไฟล์นี้ไม่เปิดอะไรของ SDL เลย (เครื่องมือ/headless ใช้ได้ทันที)
+# หน้าจอและนาฬิกาสร้างตอนเปิดหน้าต่างจริงเท่านั้น, mixer เปิดเมื่อเกมเปิดเสียง, ฟอนต์เปิดตอนวาดตัวหนังสือครั้งแรก
+# ไม่เรียก pygame.init() ที่เปิดทุกระบบ (รวมจอยสติ๊กและ mixer ที่ไม่ได้ใช้)
+# screen เป็น Surface (ตัววาด surface) หรือ TextureScreen (ตัววาด texture) ก็ได้ โค้ดวาดใช้แค่ blit/blits
+# พิกัดในเกมเป็นความละเอียดตรรกะ WIDTH x HEIGHT เสมอ ตัววาด texture ย่อ/ขยายไปตามขนาดหน้าต่างเอง
+screen = None
+clock = None
+
+
+def init_audio():
+    if pygame.mixer.get_init():
+        return
+    # --- เตรียม mixer ก่อน init เพื่อลดดีเลย์ ---
+    pygame.mixer.pre_init(44100, -16, 2, 512)
+    try:
+        pygame.mixer.init()
+    except Exception as e:
+        print("pygame.mixer.init() failed:", e)
+
+
+def init_display(renderer="surface", window_size=None, software=False):
+    # window_size / software ใช้กับตัววาด texture เท่านั้น
+    global screen, clock
+    if screen is None:
+        pygame.display.init()
+        if renderer == "texture":
+            screen = TextureScreen((WIDTH, HEIGHT), window_size, TITLE, software)
+        else:
+            screen = pygame.display.set_mode((WIDTH, HEIGHT))
+            pygame.display.set_caption(TITLE)
+        clock = pygame.time.Clock()
+    return screen
+
+
+# --- อินพุตของผู้เล่นในหนึ่งเฟรม (แยกจาก pygame เพื่อให้จำลองเกมแบบ headless ได้) ---
+class InputState:
+    def __init__(self, left=False, right=False, up=False, down=False,
+                 fire=False, fire_up=False, aim=(0, 0)):
+        self.left = left
+        self.right = right
+        self.up = up
+        self.down = down
+        self.fire = fire        # คลิกซ้าย ยิงไปทาง aim
+        self.fire_up = fire_up  # SPACE ยิงตรงขึ้น
+        self.aim = aim
+
+
+def read_input():
+    keys = pygame.key.get_pressed()
+    aim = pygame.mouse.get_pos()
+    if isinstance(screen, TextureScreen):
+        aim = screen.to_logical(aim)  # หน้าต่างถูกย่อ/ขยาย แปลงกลับเป็นพิกัดในเกม
+    return InputState(
+        left=bool(keys[pygame.K_a] or keys[pygame.K_LEFT]),
+        right=bool(keys[pygame.K_d] or keys[pygame.K_RIGHT]),
+        up=bool(keys[pygame.K_w] or keys[pygame.K_UP]),
+        down=bool(keys[pygame.K_s] or keys[pygame.K_DOWN]),
+        fire=bool(pygame.mouse.get_pressed()[0]),
+        fire_up=bool(keys[pygame.K_SPACE]),
+        aim=aim,
+    )
+
+
+NO_INPUT = InputState()
 
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Cute Shooter – เกมยิงปืนน่ารักๆ")
-clock = pygame.time.Clock()
 
 # --- ฟังก์ชันช่วยเหลือ ---
-def load_save():
-    if os.path.exists(SAVE_FILE):
-        try:
-            with open(SAVE_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return {"highscore": 0}
-    return {"highscore": 0}
-
-
-def save_data(data):
-    try:
-        with open(SAVE_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    except Exception:
-        pass
+# ฟอนต์/ข้อความเรนเดอร์ครั้งเดียวแล้วเก็บไว้ใช้ซ้ำ
+text_cache = TextCache(FONT_FILE)
 
 
 def draw_text(surf, text, size, x, y, color=INK, center=True, bold=False):
-    font = pygame.font.SysFont("THSarabunNew", size, bold=bold)
-    img = font.render(text, True, color)
+    img = text_cache.render(text, size, color, bold)
     rect = img.get_rect()
     if center:
         rect.center = (x, y)
@@ -67,77 +189,191 @@ def clamp(v, a, b):
     return max(a, min(b, v))
 
 
-# --- พาร์ติเคิลวิ๊ง ๆ ---
-class Particle:
-    def __init__(self, x, y, color):
-        self.x = x
-        self.y = y
-        self.vx = random.uniform(-1.5, 1.5)
-        self.vy = random.uniform(-2.0, -0.5)
-        self.life = random.randint(20, 40)
-        self.size = random.randint(2, 4)
-        self.color = color
+def countdown(t, dt):
+    # ตัวจับเวลา (วินาที) นับถอยหลัง ปัดเศษทศนิยมเล็ก ๆ ให้เป็น 0 จะได้ไม่เกินไปหนึ่งรอบ
+    t -= dt
+    return t if t > TIMER_EPS else 0.0
 
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.vy += 0.05
-        self.life -= 1
 
-    def draw(self, surf):
-        if self.life > 0:
-            pygame.draw.circle(surf, self.color, (int(self.x), int(self.y)), self.size)
+def lerp_pos(obj, alpha):
+    # ตำแหน่งระหว่างรอบจำลองก่อนหน้ากับรอบล่าสุด ใช้วาดให้ลื่นบนจอเฟรมเรตสูง
+    return (obj.prev_x + (obj.x - obj.prev_x) * alpha,
+            obj.prev_y + (obj.y - obj.prev_y) * alpha)
+
+
+# --- รูปทรงต่าง ๆ (ใช้อบลงแอตลาสครั้งเดียว แล้วเฟรมต่อไปแค่ blit) ---
+atlas = SpriteAtlas()
+
+
+def paint_bullet(surf, x, y, radius, color):
+    pygame.draw.circle(surf, color, (x, y), radius)
+
+
+def paint_player(surf, x, y, color, eye_col):
+    # ตัวแมววงรี + หูสามเหลี่ยม
+    body_rect = pygame.Rect(0, 0, 48, 40)
+    body_rect.center = (x, y)
+    pygame.draw.ellipse(surf, color, body_rect)
+    # หู
+    pygame.draw.polygon(surf, color, [(x-12, y-12), (x-2, y-30), (x-20, y-24)])
+    pygame.draw.polygon(surf, color, [(x+12, y-12), (x+2, y-30), (x+20, y-24)])
+    # ตา
+    pygame.draw.circle(surf, eye_col, (x-8, y-3), 4)
+    pygame.draw.circle(surf, eye_col, (x+8, y-3), 4)
+    # หนวด
+    pygame.draw.line(surf, eye_col, (x-16, y+4), (x-30, y+2), 2)
+    pygame.draw.line(surf, eye_col, (x-16, y+8), (x-30, y+10), 2)
+    pygame.draw.line(surf, eye_col, (x+16, y+4), (x+30, y+2), 2)
+    pygame.draw.line(surf, eye_col, (x+16, y+8), (x+30, y+10), 2)
+
+
+def paint_enemy(surf, x, y, radius, color):
+    # เจลลี่เงา
+    pygame.draw.circle(surf, color, (x, y), radius)
+    pygame.draw.circle(surf, WHITE, (x - radius//3, y - radius//4), max(2, radius//5))
+
+
+def paint_heart(surf, x, y):
+    # วาดหัวใจง่าย ๆ
+    pygame.draw.circle(surf, (255, 105, 180), (x-6, y-4), 6)
+    pygame.draw.circle(surf, (255, 105, 180), (x+6, y-4), 6)
+    pygame.draw.polygon(surf, (255, 105, 180), [(x-12, y-2), (x+12, y-2), (x, y+12)])
+
+
+def paint_triple(surf, x, y):
+    pygame.draw.rect(surf, (255, 215, 0), pygame.Rect(x-10, y-10, 20, 20), border_radius=6)
+    pygame.draw.circle(surf, WHITE, (x, y), 3)
+
+
+def paint_hud_heart(surf, x, y):
+    pygame.draw.circle(surf, (255,105,180), (x-6, y), 7)
+    pygame.draw.circle(surf, (255,105,180), (x+6, y), 7)
+    pygame.draw.polygon(surf, (255,105,180), [(x-12, y+2), (x+12, y+2), (x, y+16)])
+
+
+def paint_star(surf, x, y, size):
+    pygame.draw.circle(surf, (240, 240, 255), (x, y), size)
+
+
+_static_bg = None
+
+
+def static_background():
+    global _static_bg
+    if _static_bg is None:
+        bg = pygame.Surface((WIDTH, HEIGHT))
+        bg.fill(PASTEL_BG)
+        # กรอบโค้งมน
+        pygame.draw.rect(bg, (255, 255, 255), pygame.Rect(10, 10, WIDTH-20, HEIGHT-20), border_radius=24)
+        if pygame.display.get_surface() is not None:
+            bg = bg.convert()
+        _static_bg = bg
+    return _static_bg
+
+
+def prebake_sprites():
+    # อบทุกแบบไว้ก่อนเริ่มเกม จะได้ไม่กระตุกตอนเจอศัตรูสี/ขนาดใหม่ครั้งแรก
+    enemy_sprite_table()
+    for blink, eye_col in ((False, INK), (True, (200,200,200))):
+        atlas.get(('player', PASTEL_5, blink), (64, 56), (32, 32), paint_player, PASTEL_5, eye_col)
+    powerup_sprite_table()
+    bullet_sprite()
+    static_background()
+
+
+# --- สไปรท์ของเอนทิตีแต่ละชนิด (อบในแอตลาส แล้วจัดเป็นตารางให้เลือกด้วย index) ---
+def bullet_sprite():
+    r = Bullets.radius
+    return atlas.get(('bullet', r, Bullets.color), (r*2 + 2, r*2 + 2), (r + 1, r + 1),
+                     paint_bullet, r, Bullets.color)
+
+
+def enemy_sprite_table():
+    # index = สี * จำนวนขนาด + (รัศมี - รัศมีเล็กสุด)
+    return [atlas.get(('enemy', r, color), (r*2 + 2, r*2 + 2), (r + 1, r + 1), paint_enemy, r, color)
+            for color in ENEMY_COLORS for r in ENEMY_RADII]
+
+
+def powerup_sprite_table():
+    return [atlas.get(('powerup', kind), (28, 28), (14, 14), paint_heart if kind == 'heart' else paint_triple)
+            for kind in POWERUP_KINDS]
+
+
+def sprite_items(imgs, x, y):
+    # (surface, ตำแหน่ง) พร้อมส่งเข้า Surface.blits ; imgs เป็นลิสต์หรือ surface เดียวก็ได้
+    xs = x.tolist()
+    ys = y.tolist()
+    if isinstance(imgs, list):
+        return list(zip(imgs, zip(xs, ys)))
+    return [(imgs, pos) for pos in zip(xs, ys)]
 
 
 # --- กระสุน ---
-class Bullet(pygame.sprite.Sprite):
-    def __init__(self, x, y, angle_deg, speed=9):
-        super().__init__()
-        self.x = x
-        self.y = y
+class Bullets(EntityStore):
+    # กระสุนทุกนัดเก็บเป็น array (ดู entity_store.py) อัพเดตทีเดียวทั้งชุด
+    radius = 6
+    color = PASTEL_2
+
+    def __init__(self, capacity=1024):
+        f8 = np.float64
+        super().__init__({"x": f8, "y": f8, "px": f8, "py": f8, "vx": f8, "vy": f8}, capacity)
+
+    def spawn(self, x, y, angle_deg, speed=540):
         ang = math.radians(angle_deg)
-        self.vx = math.cos(ang) * speed
-        self.vy = math.sin(ang) * speed
-        self.radius = 6
-        self.color = PASTEL_2
-        self.rect = pygame.Rect(self.x - self.radius, self.y - self.radius, self.radius*2, self.radius*2)
-
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.rect.center = (self.x, self.y)
+        return self.add(x=x, y=y, px=x, py=y, vx=math.cos(ang) * speed, vy=math.sin(ang) * speed)
+
+    def update(self, dt):
+        n = self.count
+        if n == 0:
+            return
+        x, y = self.x[:n], self.y[:n]
+        self.px[:n] = x
+        self.py[:n] = y
+        x += self.vx[:n] * dt
+        y += self.vy[:n] * dt
         # ออกนอกจอให้ฆ่า
-        if self.x < -10 or self.x > WIDTH+10 or self.y < -10 or self.y > HEIGHT+10:
-            self.kill()
+        self.kill_mask((x < -10) | (x > WIDTH+10) | (y < -10) | (y > HEIGHT+10))
+        self.compact()
 
-    def draw(self, surf):
-        pygame.draw.circle(surf, self.color, (int(self.x), int(self.y)), self.radius)
+    def boxes(self, alpha=1.0):
+        img, (ax, ay) = bullet_sprite()
+        x, y = self.positions(alpha)
+        x0 = x.astype(np.int32) - ax
+        y0 = y.astype(np.int32) - ay
+        return x0, y0, x0 + img.get_width(), y0 + img.get_height()
+
+    def sprites(self, alpha=1.0):
+        img, (ax, ay) = bullet_sprite()
+        x, y = self.positions(alpha)
+        # int() ตัดทศนิยมแบบเดียวกับ atlas.item
+        return sprite_items(img, x.astype(np.int32) - ax, y.astype(np.int32) - ay)
 
 
 # --- ผู้เล่น (ตัวละครแมวน่ารัก) ---
 class Player(pygame.sprite.Sprite):
     def __init__(self):
         super().__init__()
-        self.x = WIDTH//2
-        self.y = HEIGHT - 80
-        self.speed = 5
+        self.x = self.prev_x = WIDTH//2
+        self.y = self.prev_y = HEIGHT - 80
+        self.speed = 300  # px/วินาที
         self.radius = 20
         self.color = PASTEL_5
         self.rect = pygame.Rect(self.x-20, self.y-20, 40, 40)
-        self.shoot_cd = 0
+        # ตัวจับเวลาทั้งหมดเป็นวินาที
+        self.shoot_cd = 0.0
         self.hp = 3
-        self.invuln = 0
-        self.power_triple = 0  # วินาทีของบัพยิงสามทาง
+        self.invuln = 0.0
+        self.power_triple = 0.0  # วินาทีของบัพยิงสามทาง
 
-    def update(self, keys):
+    def update(self, inp, dt):
         dx = dy = 0
-        if keys[pygame.K_a] or keys[pygame.K_LEFT]:
+        if inp.left:
             dx -= 1
-        if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
+        if inp.right:
             dx += 1
-        if keys[pygame.K_w] or keys[pygame.K_UP]:
+        if inp.up:
             dy -= 1
-        if keys[pygame.K_s] or keys[pygame.K_DOWN]:
+        if inp.down:
             dy += 1
 
         # ปรับความเร็วแนวทแยงให้พอดี
@@ -145,189 +381,407 @@ class Player(pygame.sprite.Sprite):
             dx *= 0.7071
             dy *= 0.7071
 
-        self.x += dx * self.speed
-        self.y += dy * self.speed
+        self.prev_x, self.prev_y = self.x, self.y
+        self.x += dx * self.speed * dt
+        self.y += dy * self.speed * dt
         self.x = clamp(self.x, 30, WIDTH-30)
         self.y = clamp(self.y, 30, HEIGHT-30)
         self.rect.center = (self.x, self.y)
 
         if self.shoot_cd > 0:
-            self.shoot_cd -= 1
+            self.shoot_cd = countdown(self.shoot_cd, dt)
         if self.invuln > 0:
-            self.invuln -= 1
+            self.invuln = countdown(self.invuln, dt)
         if self.power_triple > 0:
-            self.power_triple -= 1
+            self.power_triple = countdown(self.power_triple, dt)
 
-    def shoot(self, target_pos, bullets, sfx=None):
+    def shoot(self, target_pos, bullets):
+        # คืน True ถ้ายิงออกไปจริง (ให้เกมเล่นเสียง)
         if self.shoot_cd > 0:
-            return
+            return False
         # คำนวณมุมจากผู้เล่นไปเมาส์
         tx, ty = target_pos
         ang = math.degrees(math.atan2(ty - self.y, tx - self.x))
         if self.power_triple > 0:
             for off in (-12, 0, 12):
-                bullets.add(Bullet(self.x, self.y, ang + off))
+                bullets.spawn(self.x, self.y, ang + off)
         else:
-            bullets.add(Bullet(self.x, self.y, ang))
-        self.shoot_cd = 10  # คูลดาวน์เล็กน้อย
-        if sfx:
-            try:
-                sfx.play()
-            except Exception:
-                pass
+            bullets.spawn(self.x, self.y, ang)
+        self.shoot_cd = 10 / 60  # คูลดาวน์เล็กน้อย
+        return True
 
     def hit(self):
         if self.invuln <= 0:
             self.hp -= 1
-            self.invuln = 60  # 1 วินาทีอมตะหลังโดน
+            self.invuln = 1.0  # 1 วินาทีอมตะหลังโดน
             return True
         return False
 
+    def copy_from(self, other):
+        # เฉพาะค่าที่ใช้วาดตัวผู้เล่นและ HUD
+        self.x, self.y, self.prev_x, self.prev_y = other.x, other.y, other.prev_x, other.prev_y
+        self.hp, self.invuln, self.power_triple, self.color = other.hp, other.invuln, other.power_triple, other.color
+
+    def sprite(self, alpha=1.0):
+        # กะพริบตาตอนอมตะ: สลับสไปรท์สองแบบทุก 1/12 วินาที
+        blink = int(self.invuln * 12) % 2 != 0
+        eye_col = (200,200,200) if blink else INK
+        x, y = lerp_pos(self, alpha)
+        return atlas.item(('player', self.color, blink), x, y,
+                          (64, 56), (32, 32), paint_player, self.color, eye_col)
+
     def draw(self, surf):
-        # ตัวแมววงรี + หูสามเหลี่ยม
-        body_rect = pygame.Rect(0, 0, 48, 40)
-        body_rect.center = (self.x, self.y)
-        pygame.draw.ellipse(surf, self.color, body_rect)
-        # หู
-        pygame.draw.polygon(surf, self.color, [(self.x-12, self.y-12), (self.x-2, self.y-30), (self.x-20, self.y-24)])
-        pygame.draw.polygon(surf, self.color, [(self.x+12, self.y-12), (self.x+2, self.y-30), (self.x+20, self.y-24)])
-        # ตา
-        eye_col = INK if (self.invuln//5)%2==0 else (200,200,200)
-        pygame.draw.circle(surf, eye_col, (int(self.x-8), int(self.y-3)), 4)
-        pygame.draw.circle(surf, eye_col, (int(self.x+8), int(self.y-3)), 4)
-        # หนวด
-        pygame.draw.line(surf, eye_col, (self.x-16, self.y+4), (self.x-30, self.y+2), 2)
-        pygame.draw.line(surf, eye_col, (self.x-16, self.y+8), (self.x-30, self.y+10), 2)
-        pygame.draw.line(surf, eye_col, (self.x+16, self.y+4), (self.x+30, self.y+2), 2)
-        pygame.draw.line(surf, eye_col, (self.x+16, self.y+8), (self.x+30, self.y+10), 2)
+        surf.blit(*self.sprite())
 
 
 # --- ศัตรู (เจลลี่น่ารัก) ---
-class Enemy(pygame.sprite.Sprite):
-    def __init__(self, level):
-        super().__init__()
-        self.radius = random.randint(14, 24)
-        self.x = random.randint(self.radius, WIDTH - self.radius)
-        self.y = -self.radius - 10
-        base_speed = 1.6 + min(level*0.08, 3.0)
-        self.vy = random.uniform(base_speed, base_speed + 1.2)
-        self.vx = random.uniform(-0.8, 0.8)
-        self.color = random.choice([PASTEL_1, PASTEL_2, PASTEL_3, PASTEL_4, PASTEL_5])
-        self.hp = 1 if self.radius < 20 else 2
-        self.rect = pygame.Rect(self.x-self.radius, self.y-self.radius, self.radius*2, self.radius*2)
-
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        if self.x < self.radius or self.x > WIDTH - self.radius:
-            self.vx *= -1
-        self.rect.center = (self.x, self.y)
-        if self.y - self.radius > HEIGHT + 40:
-            self.kill()
-
-    def draw(self, surf):
-        # เจลลี่เงา
-        pygame.draw.circle(surf, self.color, (int(self.x), int(self.y)), self.radius)
-        pygame.draw.circle(surf, WHITE, (int(self.x - self.radius//3), int(self.y - self.radius//4)), max(2, self.radius//5))
+class Enemies(EntityStore):
+    def __init__(self, capacity=256):
+        f8, i4 = np.float64, np.int32
+        super().__init__({
+            "x": f8, "y": f8, "px": f8, "py": f8, "vx": f8, "vy": f8,
+            "radius": i4, "hp": i4,
+            "color": i4,          # index ใน ENEMY_COLORS
+            "cx": i4, "cy": i4,   # rect.center แบบเดิม (ตำแหน่งปัดเป็น int) ใช้ตอนชนกับกระสุน
+        }, capacity)
+        self.table = None
+
+    def spawn(self, level, rng, balance=BALANCE):
+        # ลำดับการสุ่มต้องเหมือนเดิมทุกครั้ง ไม่งั้นเล่นซ้ำ/replay จะเพี้ยน
+        radius = rng.randint(ENEMY_RADII[0], ENEMY_RADII[-1])
+        x = rng.randint(radius, WIDTH - radius)
+        y = -radius - 10
+        # px/วินาที (เท่ากับ 1.6 + min(level*0.08, 3.0) px/เฟรม ที่ 60 เฟรม)
+        b = balance
+        base_speed = b.enemy_speed + min(level*b.enemy_speed_per_level, b.enemy_speed_cap)
+        vy = rng.uniform(base_speed, base_speed + b.enemy_speed_spread)
+        vx = rng.uniform(-48, 48)
+        color = ENEMY_COLORS.index(rng.choice(ENEMY_COLORS))
+        return self.add(x=x, y=y, px=x, py=y, vx=vx, vy=vy, radius=radius,
+                        hp=1 if radius < 20 else 2, color=color, cx=x, cy=y)
+
+    def update(self, dt):
+        n = self.count
+        if n == 0:
+            return
+        x, y, vx, r = self.x[:n], self.y[:n], self.vx[:n], self.radius[:n]
+        self.px[:n] = x
+        self.py[:n] = y
+        x += vx * dt
+        y += self.vy[:n] * dt
+        # ชนขอบซ้าย/ขวาให้เด้งกลับ
+        vx[(x < r) | (x > WIDTH - r)] *= -1
+        self.cx[:n] = round_half_away(x)
+        self.cy[:n] = round_half_away(y)
+        self.kill_mask(y - r > HEIGHT + 40)
+        self.compact()
+
+    def boxes(self, alpha=1.0):
+        n = self.count
+        r = self.radius[:n]
+        x, y = self.positions(alpha)
+        x0 = x.astype(np.int32) - r - 1
+        y0 = y.astype(np.int32) - r - 1
+        return x0, y0, x0 + r*2 + 2, y0 + r*2 + 2
+
+    def sprites(self, alpha=1.0):
+        n = self.count
+        if n == 0:
+            return []
+        if self.table is None:
+            self.table = [img for img, _ in enemy_sprite_table()]
+        r = self.radius[:n]
+        x, y = self.positions(alpha)
+        keys = (self.color[:n] * len(ENEMY_RADII) + r - ENEMY_RADII[0]).tolist()
+        return sprite_items(list(map(self.table.__getitem__, keys)),
+                            x.astype(np.int32) - r - 1, y.astype(np.int32) - r - 1)
 
 
 # --- ไอเทมบัพ ---
-class PowerUp(pygame.sprite.Sprite):
-    def __init__(self, x, y, kind):
-        super().__init__()
-        self.x = x
-        self.y = y
-        self.kind = kind  # 'heart' หรือ 'triple'
-        self.vy = 2.2
-        self.rect = pygame.Rect(self.x-12, self.y-12, 24, 24)
-
-    def update(self):
-        self.y += self.vy
-        self.rect.center = (self.x, self.y)
-        if self.y > HEIGHT + 30:
-            self.kill()
-
-    def draw(self, surf):
-        if self.kind == 'heart':
-            # วาดหัวใจง่าย ๆ
-            x, y = int(self.x), int(self.y)
-            pygame.draw.circle(surf, (255, 105, 180), (x-6, y-4), 6)
-            pygame.draw.circle(surf, (255, 105, 180), (x+6, y-4), 6)
-            pygame.draw.polygon(surf, (255, 105, 180), [(x-12, y-2), (x+12, y-2), (x, y+12)])
-        else:
-            pygame.draw.rect(surf, (255, 215, 0), pygame.Rect(self.x-10, self.y-10, 20, 20), border_radius=6)
-            pygame.draw.circle(surf, WHITE, (int(self.x), int(self.y)), 3)
+class PowerUps(EntityStore):
+    size = 24    # ขนาด rect ที่ใช้ชน
+    speed = 132  # px/วินาที
+
+    def __init__(self, capacity=32):
+        f8, i4 = np.float64, np.int32
+        super().__init__({
+            "x": f8, "y": f8, "px": f8, "py": f8,
+            "kind": i4,            # index ใน POWERUP_KINDS
+            "left": i4, "top": i4,  # มุมซ้ายบนของ rect แบบเดิม
+        }, capacity)
+        self.table = None
+
+    def spawn(self, x, y, kind):
+        h = self.size // 2
+        return self.add(x=x, y=y, px=x, py=y, kind=POWERUP_KINDS.index(kind),
+                        left=int(x - h), top=int(y - h))
+
+    def update(self, dt):
+        n = self.count
+        if n == 0:
+            return
+        y = self.y[:n]
+        self.px[:n] = self.x[:n]
+        self.py[:n] = y
+        y += self.speed * dt
+        h = self.size // 2
+        self.left[:n] = round_half_away(self.x[:n]) - h
+        self.top[:n] = round_half_away(y) - h
+        self.kill_mask(y > HEIGHT + 30)
+        self.compact()
+
+    def boxes(self, alpha=1.0):
+        x, y = self.positions(alpha)
+        x0 = x.astype(np.int32) - 14
+        y0 = y.astype(np.int32) - 14
+        return x0, y0, x0 + 28, y0 + 28
+
+    def sprites(self, alpha=1.0):
+        n = self.count
+        if n == 0:
+            return []
+        if self.table is None:
+            self.table = [img for img, _ in powerup_sprite_table()]
+        x, y = self.positions(alpha)
+        return sprite_items(list(map(self.table.__getitem__, self.kind[:n].tolist())),
+                            x.astype(np.int32) - 14, y.astype(np.int32) - 14)
 
 
 # --- ดาวพื้นหลัง ---
-class Star:
+class StarField:
+    # ดาวแบ่งเป็นชั้น ๆ (parallax) แต่ละชั้นอบลง Surface เดียวแล้วเลื่อนทั้งแผ่น
+    # ดาวแต่ละดวงไม่ต้องอัพเดตเอง แค่เลื่อน offset ของชั้น
+    def __init__(self, rng, count=90, layers=3):
+        # px/วินาที ชั้นไกลเลื่อนช้า ชั้นใกล้เลื่อนเร็ว
+        self.speeds = [60 * (0.2 + 0.8*(k + 0.5)/layers) for k in range(layers)]
+        self.offsets = [0.0] * layers
+        self.stars = [[] for _ in range(layers)]  # (x, y, size) ต่อชั้น
+        for _ in range(count):
+            x = rng.randint(0, WIDTH)
+            y = rng.randint(0, HEIGHT)
+            size = rng.randint(1, 3)
+            self.stars[rng.randrange(layers)].append((x, y, size))
+        self.surfaces = None
+        # offset (จำนวนเต็ม) ที่วาดล่าสุด ใช้หาว่าดาวชั้นไหนขยับบนจอบ้าง
+        self.drawn_offsets = [0] * layers
+
+    def update(self, dt):
+        for k, speed in enumerate(self.speeds):
+            self.offsets[k] = (self.offsets[k] + speed * dt) % HEIGHT
+
+    def offset(self, k, back=0.0):
+        # back = ย้อนเวลากลับกี่วินาที (ใช้ตอนวาดแบบ interpolate)
+        return int((self.offsets[k] - self.speeds[k] * back) % HEIGHT)
+
+    def bake(self):
+        self.surfaces = []
+        for layer in self.stars:
+            surf = pygame.Surface((WIDTH, HEIGHT))
+            surf.fill(atlas.colorkey)
+            for x, y, size in layer:
+                # วาดซ้ำที่ขอบบน/ล่าง ดาวที่ล้นขอบจะต่อกันพอดีตอนเลื่อนวน
+                for yy in (y - HEIGHT, y, y + HEIGHT):
+                    paint_star(surf, x, yy, size)
+            if pygame.display.get_surface() is not None:
+                surf = surf.convert()
+            surf.set_colorkey(atlas.colorkey, pygame.RLEACCEL)
+            self.surfaces.append(surf)
+
+    def draw(self, surf, rects=None, back=0.0, layers=None):
+        # rects = วาดเฉพาะในกรอบเหล่านี้ (โหมด dirty rect) ; layers = วาดแค่กี่ชั้นที่ใกล้สุด
+        if self.surfaces is None:
+            self.bake()
+        for k, layer in enumerate(self.surfaces):
+            if not self.shown(k, layers):
+                continue
+            oy = self.offset(k, back)
+            seq = [(layer, (0, oy)), (layer, (0, oy - HEIGHT))]
+            if rects is None:
+                surf.blits(seq, False)
+            else:
+                for r in rects:
+                    surf.set_clip(r)
+                    surf.blits(seq, False)
+                surf.set_clip(None)
+            self.drawn_offsets[k] = oy
+
+    def shown(self, k, layers):
+        # ชั้นท้าย ๆ อยู่ใกล้ (เลื่อนเร็ว) ตัดชั้นไกลก่อน
+        return layers is None or k >= len(self.speeds) - layers
+
+    def moved_boxes(self, back=0.0, layers=None):
+        # กล่องของดาวทุกดวงในชั้นที่เลื่อนไปอย่างน้อย 1 px (ตำแหน่งเก่าและใหม่)
+        boxes = []
+        for k, layer in enumerate(self.stars):
+            old, new = self.drawn_offsets[k], self.offset(k, back)
+            if old == new or not self.shown(k, layers):
+                continue
+            for x, y, size in layer:
+                for oy in (old, new):
+                    # ชั้นถูกวาดสองแผ่นที่ oy และ oy - HEIGHT และดาวริมขอบมีสำเนาอีกฝั่ง
+                    for wy in (y + oy - HEIGHT, y + oy, y + oy + HEIGHT):
+                        boxes.append((x - size - 1, wy - size - 1, x + size + 2, wy + size + 2))
+        return boxes
+
+    def restore(self, stars, offsets):
+        # จากสแนปช็อต ; ดาวชุดเดิมไม่ต้องอบใหม่
+        if stars != self.stars:
+            self.stars = stars
+            self.surfaces = None
+        self.offsets = list(offsets)
+
+    def copy_from(self, other):
+        # สำเนาไว้วาด ; ดาวชุดเดิม (ลิสต์เดียวกัน) ไม่ต้องอบใหม่
+        if other.stars is not self.stars:
+            self.stars = other.stars
+            self.speeds = other.speeds
+            self.surfaces = None
+        self.offsets = list(other.offsets)
+
+    def follow(self, prev):
+        # ภาพก่อนหน้าวาดจากอีกสำเนา: รับแผ่นดาวที่อบแล้วกับ offset ที่วาดล่าสุดมาใช้ต่อ
+        if prev.stars is self.stars and self.surfaces is None:
+            self.surfaces = prev.surfaces
+        self.drawn_offsets = list(prev.drawn_offsets)
+
+    def state_items(self):
+        return list(self.offsets)
+
+
+# --- ภาพนิ่งของโลกในเกม (โหมด --pipeline ดู pipeline.py) ---
+# สำเนาทุกอย่างที่โค้ดวาดอ่าน ชื่อ attribute ตรงกับของ Game จะวาดจากเกมจริงหรือจากสำเนาก็ใช้โค้ดเดียวกัน
+# array จองครั้งเดียวแล้วคัดลอกทับทุกเฟรม (ไม่กี่ร้อย KB ต่อเฟรมแม้ฉากหนัก ๆ)
+class WorldView:
     def __init__(self):
-        self.x = random.randint(0, WIDTH)
-        self.y = random.randint(0, HEIGHT)
-        self.speed = random.uniform(0.2, 1.0)
-        self.size = random.randint(1, 3)
+        self.player = Player()
+        self.bullets = Bullets()
+        self.enemies = Enemies()
+        self.powerups = PowerUps()
+        self.particles = ParticleSystem()
+        self.stars = StarField(random.Random(0), count=0)
+        self.state = "playing"
+        self.score = 0
+        self.level = 1
+        self.alpha = 1.0  # ตำแหน่งระหว่างรอบจำลองที่ใช้วาดสำเนานี้
 
-    def update(self):
-        self.y += self.speed
-        if self.y > HEIGHT:
-            self.y = 0
-            self.x = random.randint(0, WIDTH)
+    def capture(self, game, alpha):
+        self.player.copy_from(game.player)
+        for name in ("bullets", "enemies", "powerups", "particles", "stars"):
+            getattr(self, name).copy_from(getattr(game, name))
+        self.state, self.score, self.level = game.state, game.score, game.level
+        self.alpha = alpha
 
-    def draw(self, surf):
-        pygame.draw.circle(surf, (240, 240, 255), (int(self.x), int(self.y)), self.size)
+    def follow(self, prev):
+        self.stars.follow(prev.stars)
 
 
 # --- เกม ---
 class Game:
-    def __init__(self):
-        # โหลดข้อมูลง่าย ๆ แล้ว reset สถานะ
-        self.data = load_save()
-        self.highscore = self.data.get("highscore", 0)
-
-        # เตรียมตัวแปรเสียง (ถ้าไม่มีไฟล์จะเป็น None)
-        self.sfx_shoot = None
-        self.sfx_pickup = None
-        self.sfx_explosion = None
+    def __init__(self, seed=None, headless=False, render_mode="full", sim_hz=SIM_HZ, balance=None, sound=True):
+        # headless = จำลองเกมล้วน ๆ ไม่มีหน้าต่าง ไม่มีเสียง ไม่เขียนไฟล์เซฟ
+        self.headless = headless
+        # sound=False (--mute) = ไม่เปิด mixer และไม่โหลดไฟล์เสียงเลย
+        self.sound = sound and not headless
+        # เกมเดินทีละรอบเวลาคงที่ dt เสมอ ไม่ขึ้นกับว่าวาดจอได้กี่เฟรม
+        self.sim_hz = sim_hz
+        self.dt = 1.0 / sim_hz
+        # "full" = วาดใหม่ทั้งจอแล้ว flip, "dirty" = วาด/อัพเดตเฉพาะส่วนที่เปลี่ยน
+        self.render_mode = render_mode
+        self.dirty = DirtyTiles(WIDTH, HEIGHT)
+        self.dirty_valid = False
+        self.hud_key = None
+        # ลดคุณภาพการวาดเองเมื่อเฟรมเกินงบ (ดู quality.py) ; bench ล็อกขั้นด้วย quality.pin()
+        self.quality = QualityGovernor(budget=1/FPS)
+        self.hud_shown = None
+        self.hud_age = 0
+        # F3 = เปิด/ปิดกล่องสถิติ, F4 = บันทึก Chrome trace
+        self.profiler = FrameProfiler()
+        self.overlay_drawn = False
+        self.overlay_lines = []
+        self.overlay_box = None
+        self.aim_with_mouse = True  # เริ่มต้นเล็งด้วยเมาส์
+        # จังหวะเฟรม ("tick" / "precise" ดู pacing.py) และตัววัด latency (--latency)
+        self.pacer = "tick"
+        self.latency = None
+        # --pipeline: จำลองบนอีกเธรดซ้อนกับการวาด (ดู pipeline.py) ; view = ของที่โค้ดวาดอ่าน (ตัวเกมเองหรือ WorldView)
+        self.pipelined = False
+        self.view = self
+        # ตัววาด ("surface" / "texture") ขนาดหน้าต่างเริ่มต้น และบังคับตัววาดซอฟต์แวร์ของ SDL (เฉพาะ texture)
+        self.renderer = "surface"
+        self.window_size = None
+        self.software_renderer = False
+        # --capture: จับภาพทุกเฟรมลงไฟล์ (FrameCapture ดู frame_capture.py)
+        self.capture = None
+        # บันทึก replay: ตั้ง replay_dir แล้วทุกรอบเล่นจะได้ไฟล์ seed + อินพุตหนึ่งไฟล์
+        self.replay_dir = None
+        self.recorder = None
+        # กระสุน/ศัตรู/ไอเทมเก็บเป็น array ที่จองไว้ครั้งเดียว อยู่ข้ามรอบเล่น (reset แค่ล้าง)
+        self.bullets = Bullets()
+        self.enemies = Enemies()
+        self.powerups = PowerUps()
+        self.particles = None
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.balance = balance or BALANCE
+
+        # โหลดเซฟ (ดัชนี high score + ประวัติรอบเล่น) แล้ว reset สถานะ ; headless ไม่แตะไฟล์เซฟ
+        self.store = None if headless else SaveStore()
+        self.highscore = self.store.highscore if self.store else 0
+        self.last_run = None
+        # พักเกม = quicksave ลงไฟล์ (เมนูกด C เล่นต่อได้) ; ระหว่างเล่นเก็บสแนปช็อตย้อนหลังไว้กด R ย้อนเวลา
+        self.has_quicksave = not headless and os.path.exists(QUICKSAVE_FILE)
+        self.rewind = None if headless else RewindBuffer(sim_hz)
+
+        # เสียงเอฟเฟกต์ทั้งหมดผ่าน voice manager (ยังไม่มีไฟล์/headless = เงียบ)
+        self.audio = VoiceManager(SOUND_CHANNELS)
+        for name, spec in SOUNDS.items():
+            self.audio.define(name, **spec)
         self.music_loaded = False
-
-        # โหลดเสียง (try/except ไม่ให้ crash)
-        try:
-            self.sfx_shoot = pygame.mixer.Sound("shoot.wav")
-            self.sfx_shoot.set_volume(0.45)
-            print("โหลด shoot.wav สำเร็จ")
-        except Exception as e:
-            print("ไม่พบ shoot.wav:", e)
-            self.sfx_shoot = None
-
-        try:
-            self.sfx_pickup = pygame.mixer.Sound("pickup.wav")
-            self.sfx_pickup.set_volume(0.6)
-            print("โหลด pickup.wav สำเร็จ")
-        except Exception as e:
-            print("ไม่พบ pickup.wav:", e)
-            self.sfx_pickup = None
-
-        try:
-            self.sfx_explosion = pygame.mixer.Sound("explosion.mp3")
-            self.sfx_explosion.set_volume(0.5)
-            print("โหลด explosion.wav สำเร็จ")
-        except Exception as e:
-            print("ไม่พบ explosion.wav:", e)
-            self.sfx_explosion = None
-
-        try:
-            pygame.mixer.music.load("background.mp3")
-            pygame.mixer.music.set_volume(0.28)
-            self.music_loaded = True
-            print("โหลด background.mp3 สำเร็จ (ยังไม่เล่นจนกว่าจะเริ่มเกม)")
-        except Exception as e:
-            print("ไม่พบ background.mp3:", e)
-            self.music_loaded = False
+        self.assets = None
+        # พิมพ์เวลาเปิดเกมแต่ละช่วงตอนเฟรมแรกขึ้นจอ แล้วปิดเกม (--startup-trace)
+        self.startup_trace = False
 
         # สร้างข้อมูลเกมเริ่มต้น
         self.reset()
 
-    def reset(self):
+    def load_sounds(self):
+        # เรียกจาก run() หลังเปิดหน้าต่างแล้ว
+        with STARTUP.span("init audio"):
+            init_audio()
+        # ถอดรหัสไฟล์เสียงบนเธรดแยก เมนูขึ้นได้ทันที ระหว่างรอเสียงจะเงียบไปก่อน
+        self.assets = AssetLoader()
+        self.audio.open()
+        self.assets.add_sound("shoot", "shoot.wav")
+        self.assets.add_sound("pickup", "pickup.wav")
+        self.assets.add_sound("explosion", "explosion.mp3")
+        self.assets.add_music("music", "background.mp3", 0.28)
+        self.assets.start()
+
+    def sync_assets(self):
+        # เรียกทุกเฟรม: หยิบเสียงที่โหลดเสร็จแล้วมาใช้ (ถูกมาก แค่อ่าน dict)
+        assets = self.assets
+        if assets is None:
+            return
+        for name in SOUNDS:
+            if not self.audio.has(name):
+                self.audio.set_sound(name, assets.get(name))
+        if not self.music_loaded and assets.ready("music"):
+            self.music_loaded = True
+            # เพลงโหลดเสร็จตอนเริ่มเล่นไปแล้ว ให้เปิดเพลงตามหลัง
+            if self.state == "playing":
+                try:
+                    pygame.mixer.music.play(-1)
+                except Exception:
+                    pass
+        if assets.done():
+            self.assets = None
+
+    def reset(self, seed=None):
+        # ส่ง seed มาเพื่อเริ่มลำดับสุ่มใหม่ (เล่นซ้ำได้เหมือนเดิมทุกครั้ง)
+        if seed is not None:
+            self.seed = seed
+            self.rng.seed(seed)
+
         # หยุดเพลงเมื่อกลับเมนู/รีเซ็ต
         try:
             if self.music_loaded:
@@ -337,117 +791,222 @@ class Game:
 
         self.state = "menu"  # menu, playing, pause, gameover
         self.player = Player()
-        self.bullets = pygame.sprite.Group()
-        self.enemies = pygame.sprite.Group()
-        self.powerups = pygame.sprite.Group()
-        self.particles = []
-        self.stars = [Star() for _ in range(90)]
+        self.bullets.clear()
+        self.enemies.clear()
+        self.powerups.clear()
+        # พาร์ติเคิลใช้ตัวสุ่มของตัวเอง แต่ seed มาจากตัวสุ่มของเกม จึงยังเล่นซ้ำได้
+        # array ของพาร์ติเคิลจองไว้ครั้งเดียว รอบใหม่แค่ล้างแล้วตั้ง seed ใหม่
+        if self.particles is None:
+            self.particles = ParticleSystem(seed=self.rng.getrandbits(64))
+        else:
+            self.particles.clear(seed=self.rng.getrandbits(64))
+        self.stars = StarField(self.rng)
+        if self.rewind is not None:
+            self.rewind.clear()
         self.score = 0
+        self.hud_shown = None
         self.level = 1
-        self.spawn_timer = 0
-        self.spawn_cd = 45
-        self.time_played = 0
+        self.spawn_timer = 0.0
+        self.spawn_cd = self.balance.spawn_cd_start / 60
+        self.time_played = 0.0  # วินาที
+        self.ticks = 0          # จำนวนรอบจำลอง
+        self.collisions = CollisionSystem()
 
     def spawn_enemy(self):
-        self.enemies.add(Enemy(self.level))
+        self.enemies.spawn(self.level, self.rng, self.balance)
 
     def drop_powerup(self, x, y):
-        if random.random() < 0.15:
-            kind = random.choice(['heart', 'triple', 'triple', 'heart'])
-            self.powerups.add(PowerUp(x, y, kind))
+        if self.rng.random() < self.balance.drop_rate:
+            kind = self.rng.choice(['heart', 'triple', 'triple', 'heart'])
+            self.powerups.spawn(x, y, kind)
+
+    def begin_run(self):
+        # เข้าสู่การเล่น ; ถ้าเปิดบันทึก replay ให้เริ่มรอบด้วย seed ใหม่ที่จดลงไฟล์ได้
+        if self.replay_dir is not None:
+            hs = self.highscore
+            self.reset(seed=random.getrandbits(64))
+            self.highscore = hs
+            os.makedirs(self.replay_dir, exist_ok=True)
+            name = time.strftime("cute_shooter_%Y%m%d_%H%M%S") + f"_{self.seed:016x}.rep"
+            self.recorder = ReplayWriter(os.path.join(self.replay_dir, name), self.seed, self.sim_hz)
+        # เริ่มรอบใหม่ = ทิ้ง quicksave ของรอบก่อน
+        self.drop_quicksave()
+        self.state = "playing"
+
+    def stop_recording(self):
+        # ปิดไฟล์ replay พร้อมผลสุดท้ายไว้ให้ตรวจตอนเล่นซ้ำ
+        if self.recorder is None:
+            return
+        self.recorder.close(self.score, self.level, self.state_digest())
+        print("บันทึก replay แล้ว:", self.recorder.path)
+        self.recorder = None
+
+    def quicksave(self):
+        if self.store is None:
+            return
+        # ถ่ายสแนปช็อตตอนนี้ ส่วนเขียนไฟล์ให้เธรดเขียนของที่เก็บเซฟทำ
+        self.store.write_file(QUICKSAVE_FILE, save_state(self))
+        self.has_quicksave = True
+
+    def drop_quicksave(self):
+        if self.has_quicksave and self.store is not None:
+            self.store.remove_file(QUICKSAVE_FILE)
+        self.has_quicksave = False
+
+    def load_quicksave(self):
+        # โหลดรอบที่พักไว้ กลับมาในสถานะพัก ; คืน False ถ้าไฟล์หาย/เสีย
+        self.store.flush()  # quicksave ล่าสุดอาจยังเขียนไม่เสร็จ
+        try:
+            with open(QUICKSAVE_FILE, "rb") as f:
+                load_state(self, f.read())
+        except (OSError, SnapshotError) as e:
+            print("โหลด quicksave ไม่ได้:", e)
+            self.reset()
+            self.has_quicksave = False
+            return False
+        self.state = "pause"
+        self.restored()
+        return True
+
+    def rewind_back(self, seconds=REWIND_SECONDS):
+        if self.rewind is None or not len(self.rewind):
+            return False
+        # อินพุตหลังจากนี้ไม่ต่อกับรอบเดิมแล้ว ปิดไฟล์ replay ไว้ตรงนี้
+        self.stop_recording()
+        state = self.state
+        self.rewind.rewind(self, seconds)
+        self.state = state
+        self.restored()
+        return True
+
+    def restored(self):
+        # สถานะเพิ่งถูกโหลดทับ: ภาพบนจอกับ HUD ที่จำไว้ใช้ไม่ได้แล้ว
+        self.dirty_valid = False
+        self.hud_shown = None
 
     def update_menu(self):
         pass
 
-    def update_playing(self):
-        keys = pygame.key.get_pressed()
-        self.player.update(keys)
+    def update_playing(self, inp=None):
+        # เดินเกมหนึ่งรอบ (self.dt วินาที) แบ่งเป็นช่วง ๆ ให้จับเวลาแยกได้
+        prof = self.profiler
+        if inp is None:
+            with prof.span("input"):
+                inp = read_input()
+        if self.recorder is not None:
+            self.recorder.record(inp, self.aim_with_mouse)
+        with prof.span("update.entities"):
+            self.update_movement(inp)
+        with prof.span("update.spawn"):
+            self.update_spawn()
+        self.update_collisions()
+        with prof.span("update.particles"):
+            self.update_particles()
+        with prof.span("update.gameover"):
+            self.update_gameover()
+        self.time_played += self.dt
+        self.ticks += 1
+        if self.rewind is not None:
+            self.rewind.tick(self)
+        if self.recorder is not None and self.state != "playing":
+            self.stop_recording()
+
+    def update_movement(self, inp):
+        dt = self.dt
+        self.player.update(inp, dt)
 
         # ยิงด้วยคลิกเมาส์ซ้ายหรือ Space
-        mouse_pressed = pygame.mouse.get_pressed()[0]
-        if mouse_pressed:
-            self.player.shoot(pygame.mouse.get_pos(), self.bullets, self.sfx_shoot)
-        if keys[pygame.K_SPACE]:
+        if inp.fire:
+            if self.player.shoot(inp.aim, self.bullets):
+                self.audio.play("shoot")
+        if inp.fire_up:
             # ยิงตรงขึ้นถ้าไม่ใช้เมาส์
-            self.player.shoot((self.player.x, self.player.y-1000), self.bullets, self.sfx_shoot)
-
-        self.bullets.update()
-        for e in list(self.enemies):
-            e.update()
-        for p in list(self.powerups):
-            p.update()
-        for s in self.stars:
-            s.update()
-
-        # สุ่มเกิดศัตรูเพิ่มตามเลเวล
-        self.spawn_timer -= 1
+            if self.player.shoot((self.player.x, self.player.y-1000), self.bullets):
+                self.audio.play("shoot")
+
+        # เคลื่อนที่ เด้งขอบ และตัดตัวที่ออกนอกจอ ทีละทั้งชนิด
+        self.bullets.update(dt)
+        self.enemies.update(dt)
+        self.powerups.update(dt)
+        self.stars.update(dt)
+
+    def update_spawn(self):
+        # สุ่มเกิดศัตรูเพิ่มตามเลเวล (คูลดาวน์เดิมนับเป็นเฟรมที่ 60 FPS)
+        self.spawn_timer = countdown(self.spawn_timer, self.dt)
         if self.spawn_timer <= 0:
             self.spawn_enemy()
-            self.spawn_cd = max(12, 45 - int(self.level*1.7))
+            b = self.balance
+            self.spawn_cd = max(b.spawn_cd_min, b.spawn_cd_start - int(self.level*b.spawn_cd_per_level)) / 60
             self.spawn_timer = self.spawn_cd
 
-        # ชนกระสุนกับศัตรู
-        for e in list(self.enemies):
-            for b in list(self.bullets):
-                # ใช้ระยะวงกลมตรวจ
-                if (e.rect.centerx - b.x)**2 + (e.rect.centery - b.y)**2 <= (e.radius + b.radius)**2:
-                    b.kill()
-                    e.hp -= 1
-                    # พาร์ติเคิลระเบิดคิวท์ ๆ
-                    for _ in range(10):
-                        self.particles.append(Particle(e.x, e.y, e.color))
-                    if e.hp <= 0:
-                        # เล่นเสียงระเบิด
-                        if self.sfx_explosion:
-                            try:
-                                self.sfx_explosion.play()
-                            except Exception:
-                                pass
-                        self.score += 10
-                        self.drop_powerup(e.x, e.y)
-                        e.kill()
-                        if self.score % 100 == 0:
-                            self.level += 1
+    def update_collisions(self):
+        prof = self.profiler
+        bullets, enemies, powerups = self.bullets, self.enemies, self.powerups
+        # ชนกระสุนกับศัตรู (broadphase แบบตารางช่อง แล้วค่อยวัดระยะวงกลม)
+        with prof.span("collide.bullets"):
+            nb, ne = len(bullets), len(enemies)
+            hits = self.collisions.bullets_vs_enemies(
+                bullets.x[:nb], bullets.y[:nb], Bullets.radius,
+                enemies.cx[:ne], enemies.cy[:ne], enemies.radius[:ne])
+            for bi, ei in hits:
+                bullets.kill(bi)
+                enemies.hp[ei] -= 1
+                ex, ey = enemies.x[ei].item(), enemies.y[ei].item()
+                # พาร์ติเคิลระเบิดคิวท์ ๆ
+                self.particles.emit(ex, ey, ENEMY_COLORS[enemies.color[ei]], 10)
+                if enemies.hp[ei] <= 0:
+                    # เล่นเสียงระเบิด (ตายพร้อมกันหลายตัวรวมเป็นเสียงเดียว)
+                    self.audio.play("explosion")
+                    self.score += 10
+                    self.drop_powerup(ex, ey)
+                    enemies.kill(ei)
+                    if self.score % self.balance.level_every == 0:
+                        self.level += 1
+            # ตัวที่ตายหายไปจริงตอนนี้ (ระหว่าง pass ยังอยู่ใน array เหมือนลูปเดิม)
+            bullets.compact()
+            enemies.compact()
 
         # เก็บไอเทม
-        if self.player and self.player.hp > 0:
-            for pu in list(self.powerups):
-                if self.player.rect.colliderect(pu.rect):
-                    if pu.kind == 'heart':
-                        self.player.hp = min(5, self.player.hp + 1)
+        with prof.span("collide.pickups"):
+            player = self.player
+            if player and player.hp > 0:
+                n = len(powerups)
+                for i in self.collisions.player_vs_powerups(player.rect, powerups.left[:n],
+                                                            powerups.top[:n], PowerUps.size):
+                    if POWERUP_KINDS[powerups.kind[i]] == 'heart':
+                        player.hp = min(5, player.hp + 1)
                     else:
-                        self.player.power_triple = 60 * 8  # 8 วินาที
+                        player.power_triple = 8.0  # 8 วินาที
 
                     # เล่นเสียงเก็บรางวัล
-                    if self.sfx_pickup:
-                        try:
-                            self.sfx_pickup.play()
-                        except Exception:
-                            pass
+                    self.audio.play("pickup")
 
-                    for _ in range(15):
-                        self.particles.append(Particle(pu.x, pu.y, (255, 215, 0)))
-                    pu.kill()
+                    self.particles.emit(powerups.x[i].item(), powerups.y[i].item(), (255, 215, 0), 15)
+                    powerups.kill(i)
+                powerups.compact()
 
         # ศัตรูชนผู้เล่น
-        for e in list(self.enemies):
-            dist2 = (e.x - self.player.x)**2 + (e.y - self.player.y)**2
-            if dist2 <= (e.radius + self.player.radius)**2:
-                if self.player.hit():
-                    for _ in range(20):
-                        self.particles.append(Particle(self.player.x, self.player.y, PASTEL_1))
-
-        # อัพเดตพาร์ติเคิล
-        for pt in list(self.particles):
-            pt.update()
-            if pt.life <= 0:
-                self.particles.remove(pt)
-
+        with prof.span("collide.player"):
+            player = self.player
+            n = len(enemies)
+            for _ in self.collisions.enemies_vs_player(enemies.x[:n], enemies.y[:n], enemies.radius[:n],
+                                                       player.x, player.y, player.radius):
+                if player.hit():
+                    self.particles.emit(player.x, player.y, PASTEL_1, 20)
+
+    def update_particles(self):
+        # อัพเดตพาร์ติเคิล (ทั้งก้อนด้วย numpy)
+        self.particles.update(self.dt)
+
+    def update_gameover(self):
         # เช็คจบเกม
         if self.player.hp <= 0:
             self.state = "gameover"
             self.highscore = max(self.highscore, self.score)
-            save_data({"highscore": self.highscore})
+            if self.store is not None:
+                # แค่ส่งงานให้เธรดเขียน เฟรมนี้ไม่ต้องรอดิสก์
+                self.last_run = self.store.record_run(self.score, self.level, self.time_played)
+            self.drop_quicksave()
             # หยุดเพลงเมื่อเกมจบ
             try:
                 if self.music_loaded:
@@ -455,30 +1014,56 @@ class Game:
             except Exception:
                 pass
 
-        self.time_played += 1
+    # --- โหมดจำลอง (headless) ---
+    def start(self):
+        self.state = "playing"
+
+    def step(self, inp=NO_INPUT):
+        # เดินเกมหนึ่งเฟรมด้วยอินพุตที่กำหนดเอง (ไม่แตะ pygame.key/mouse)
+        if self.state == "playing":
+            self.update_playing(inp)
+        return self.state
+
+    def state_digest(self):
+        # แฮชสถานะทั้งหมด ใช้เทียบว่าจำลองซ้ำแล้วได้ผลตรงกันไหม
+        p = self.player
+        parts = [
+            (self.score, self.level, self.spawn_timer, self.ticks, self.state),
+            (p.x, p.y, p.hp, p.invuln, p.shoot_cd, p.power_triple),
+            self.enemies.rows("x", "y", "vx", "vy", "radius", "hp"),
+            self.bullets.rows("x", "y", "vx", "vy"),
+            self.powerups.rows("x", "y", "kind"),
+            self.particles.state_items(),
+            self.stars.state_items(),
+        ]
+        return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+    def hud_state(self):
+        # ค่าที่ HUD แสดง เรียกเฟรมละครั้ง ; คุณภาพต่ำจะอัพเดตห่างขึ้น (ทุก hud_every เฟรม)
+        self.hud_age += 1
+        if self.hud_shown is None or self.hud_age >= self.quality.settings["hud_every"]:
+            view = self.view
+            p = view.player
+            self.hud_shown = (p.hp, view.score, view.level, int(p.power_triple) if p.power_triple > 0 else -1)
+            self.hud_age = 0
+        return self.hud_shown
 
     def draw_hud(self, surf):
+        hp, score, level, triple = self.hud_shown or self.hud_state()
         # แถบหัวใจ
-        for i in range(self.player.hp):
-            x = 20 + i*26
-            y = 20
-            pygame.draw.circle(surf, (255,105,180), (x-6, y), 7)
-            pygame.draw.circle(surf, (255,105,180), (x+6, y), 7)
-            pygame.draw.polygon(surf, (255,105,180), [(x-12, y+2), (x+12, y+2), (x, y+16)])
+        surf.blits([atlas.item(('hud_heart',), 20 + i*26, 20, (30, 26), (15, 8), paint_hud_heart)
+                    for i in range(hp)], False)
         # คะแนน & เลเวล
-        draw_text(surf, f"คะแนน: {self.score}", 26, WIDTH-130, 24, center=False)
-        draw_text(surf, f"เลเวล: {self.level}", 22, WIDTH-130, 52, center=False)
+        draw_text(surf, f"คะแนน: {score}", 26, WIDTH-130, 24, center=False)
+        draw_text(surf, f"เลเวล: {level}", 22, WIDTH-130, 52, center=False)
         # บัฟสามทาง
-        if self.player.power_triple > 0:
-            sec = self.player.power_triple // 60
-            draw_text(surf, f"Triple: {sec}s", 22, WIDTH-130, 80, center=False, color=(120,120,120))
+        if triple >= 0:
+            draw_text(surf, f"Triple: {triple}s", 22, WIDTH-130, 80, center=False, color=(120,120,120))
 
-    def draw_bg(self, surf):
-        surf.fill(PASTEL_BG)
-        # กรอบโค้งมน
-        pygame.draw.rect(surf, (255, 255, 255), pygame.Rect(10, 10, WIDTH-20, HEIGHT-20), border_radius=24)
-        for s in self.stars:
-            s.draw(surf)
+    def draw_bg(self, surf, alpha=1.0):
+        # พื้น + กรอบโค้งมนไม่เคยเปลี่ยน อบไว้แผ่นเดียวแล้ว blit ทับทั้งจอ
+        surf.blit(static_background(), (0, 0))
+        self.view.stars.draw(surf, back=(1.0 - alpha) * self.dt, layers=self.quality.settings["star_layers"])
 
     def draw_menu(self, surf):
         self.draw_bg(surf)
@@ -486,101 +1071,406 @@ class Game:
         draw_text(surf, "เกมยิงปืนน่ารักๆ ด้วย Python (Pygame)", 26, WIDTH//2, 210)
         draw_text(surf, "คลิกซ้ายหรือกด SPACE เพื่อยิง | เดิน: W A S D", 22, WIDTH//2, 250, color=(100,100,100))
         draw_text(surf, f"สถิติ: High Score {self.highscore}", 24, WIDTH//2, 290)
+        if self.store is not None:
+            # อันดับจากดัชนีในหน่วยความจำ ไม่ต้องอ่าน log
+            top = self.store.top(3)
+            if top:
+                board = "   ".join(f"{i}. {r['score']}" for i, r in enumerate(top, 1))
+                draw_text(surf, f"อันดับ: {board}   (เล่นไป {self.store.data['runs']} รอบ)", 18,
+                          WIDTH//2, 318, color=(120,120,120))
         draw_text(surf, "กด [ENTER] เพื่อเริ่ม", 28, WIDTH//2, 360, color=PASTEL_5, bold=True)
         draw_text(surf, "กด [M] เพื่อปิด/เปิดเมาส์เล็ง (เริ่มต้น: ใช้เมาส์เล็ง)", 18, WIDTH//2, 400, color=(120,120,120))
+        if self.has_quicksave:
+            draw_text(surf, "กด [C] เล่นต่อจากที่พักไว้", 22, WIDTH//2, 432, color=PASTEL_5)
+        if self.assets is not None:
+            done, total = self.assets.progress()
+            draw_text(surf, f"กำลังโหลดเสียง {done}/{total}", 18, WIDTH//2, HEIGHT - 40, color=(150,150,150))
 
     def draw_pause(self, surf):
         draw_text(surf, "พักเกม", 48, WIDTH//2, HEIGHT//2 - 20)
-        draw_text(surf, "กด [P] ต่อ | [ESC] ออกเมนู", 24, WIDTH//2, HEIGHT//2 + 30)
+        draw_text(surf, "กด [P] ต่อ | [R] ย้อน 3 วินาที | [ESC] ออกเมนู (เล่นต่อได้ทีหลัง)", 24, WIDTH//2, HEIGHT//2 + 30)
 
     def draw_gameover(self, surf):
         self.draw_bg(surf)
         draw_text(surf, "เกมจบแล้ว!", 56, WIDTH//2, 180, bold=True, color=PASTEL_1)
         draw_text(surf, f"คะแนน: {self.score}", 30, WIDTH//2, 240)
         draw_text(surf, f"สถิติสูงสุด: {self.highscore}", 26, WIDTH//2, 282)
+        if self.last_run is not None:
+            rank = next((i for i, r in enumerate(self.store.top(), 1) if r is self.last_run), None)
+            if rank:
+                draw_text(surf, f"ติดอันดับ {rank} !", 20, WIDTH//2, 306, color=PASTEL_5)
         draw_text(surf, "[ENTER] เล่นอีกครั้ง  |  [ESC] กลับเมนู", 22, WIDTH//2, 330)
 
-    def draw_playing(self, surf):
-        self.draw_bg(surf)
-        # วาดสไปรท์
-        for e in self.enemies:
-            e.draw(surf)
-        for b in self.bullets:
-            b.draw(surf)
-        for p in self.powerups:
-            p.draw(surf)
-        self.player.draw(surf)
+    def sprite_layers(self, alpha=1.0):
+        # (surface, ตำแหน่ง) ของทุกสไปรท์ แยกชั้นตามลำดับการวาด
+        view = self.view
+        return [
+            view.enemies.sprites(alpha),
+            view.bullets.sprites(alpha),
+            view.powerups.sprites(alpha),
+            [view.player.sprite(alpha)],
+        ]
+
+    def draw_playing_dirty(self, surf, alpha=1.0):
+        # วาดเฉพาะ tile ที่เปลี่ยน คืนลิสต์ rect สำหรับ display.update
+        # หรือ None ถ้าตัดสินใจวาดเต็มจอ (ผู้เรียกต้อง flip ทั้งจอ)
+        tiles = self.dirty
+        tiles.begin()
+        view = self.view
+        back = (1.0 - alpha) * self.dt
+        layers = self.sprite_layers(alpha)
+        for store in (view.enemies, view.bullets, view.powerups):
+            tiles.mark_boxes(*store.boxes(alpha))
+        img, (x, y) = layers[-1][0]
+        tiles.mark_rects([(x, y, img.get_width(), img.get_height())])
+        q = self.quality.settings
+        tiles.mark_boxes(*view.particles.boxes(alpha, q["burst_cap"]))
+        boxes = view.stars.moved_boxes(back, q["star_layers"])
+        if boxes:
+            b = np.array(boxes, dtype=np.int32)
+            tiles.mark_boxes(b[:, 0], b[:, 1], b[:, 2], b[:, 3], drawn=False)
+
+        hud_key = self.hud_state()
+        redraw_hud = hud_key != self.hud_key or any(tiles.touches(r) for r in HUD_REGIONS)
+        if redraw_hud:
+            for r in HUD_REGIONS:
+                tiles.mark_rect(r)
+        self.hud_key = hud_key
+        if self.profiler.enabled or self.overlay_drawn:
+            tiles.mark_rect(OVERLAY_RECT)
+
+        if not self.dirty_valid or tiles.too_dirty():
+            # เปลี่ยนเยอะเกินคุ้ม วาดเต็มจอไปเลย
+            tiles.settle()
+            self.draw_playing(surf, alpha, layers)
+            self.dirty_valid = True
+            return None
+
+        tiles.settle()
+        rects = tiles.rects()
+        bg = static_background()
+        for r in rects:
+            surf.blit(bg, r, r)
+        view.stars.draw(surf, rects, back, q["star_layers"])
+        for items in layers:
+            surf.blits(items, False)
+        view.particles.draw(surf, alpha, q["burst_cap"])
+        if redraw_hud:
+            with self.profiler.span("draw_hud"):
+                self.draw_hud(surf)
+        return rects
+
+    def draw_playing(self, surf, alpha=1.0, layers=None):
+        # alpha = ตำแหน่งระหว่างรอบจำลองล่าสุดกับรอบถัดไป (0..1)
+        self.draw_bg(surf, alpha)
+        # วาดสไปรท์ (หนึ่ง blits ต่อหนึ่งชั้น)
+        for items in layers or self.sprite_layers(alpha):
+            surf.blits(items, False)
         # วาดพาร์ติเคิลทีหลังสุด
-        for pt in self.particles:
-            pt.draw(surf)
-        self.draw_hud(surf)
-
-    def run(self):
+        self.view.particles.draw(surf, alpha, self.quality.settings["burst_cap"])
+        with self.profiler.span("draw_hud"):
+            if layers is None:
+                self.hud_state()  # ถ้ามาจาก draw_playing_dirty จะอัพเดตค่า HUD ของเฟรมนี้ไปแล้ว
+            self.draw_hud(surf)
+
+    def draw_frame(self, surf, alpha=1.0, view=None):
+        # วาดภาพตาม state ; คืน None = ต้อง flip ทั้งจอ, ลิสต์ rect = อัพเดตเฉพาะส่วน
+        # view = สำเนาของโลกที่จะวาด (WorldView ของโหมด pipeline) ; None = วาดจากเกมตรง ๆ
+        self.view = view or self
+        state = self.view.state
+        rects = None
+        with self.profiler.span("draw_" + state):
+            if state == "playing" and self.render_mode == "dirty":
+                rects = self.draw_playing_dirty(surf, alpha)
+            else:
+                self.dirty_valid = False
+                if state == "menu":
+                    self.draw_menu(surf)
+                elif state == "playing":
+                    self.draw_playing(surf, alpha)
+                elif state == "pause":
+                    self.draw_playing(surf)
+                    self.draw_pause(surf)
+                elif state == "gameover":
+                    self.draw_gameover(surf)
+        self.overlay_drawn = self.profiler.enabled
+        if self.overlay_drawn:
+            self.draw_profiler_overlay(surf)
+        return rects
+
+    def entity_counts(self):
+        view = self.view
+        return {
+            "enemies": len(view.enemies),
+            "bullets": len(view.bullets),
+            "powerups": len(view.powerups),
+            "particles": len(view.particles),
+        }
+
+    def draw_profiler_overlay(self, surf):
+        prof = self.profiler
+        # ตัวเลขเปลี่ยนทุกเฟรม อ่านไม่ทันอยู่แล้ว รีเฟรชข้อความทุก 10 เฟรมพอ
+        if not self.overlay_lines or prof.frame_index % 10 == 0:
+            p50, p95, p99 = prof.percentiles()
+            c = self.entity_counts()
+            self.overlay_lines = [
+                f"frame ms  p50 {p50:.2f}  p95 {p95:.2f}  p99 {p99:.2f}",
+                f"enemies {c['enemies']}  bullets {c['bullets']}",
+                f"powerups {c['powerups']}  particles {c['particles']}",
+                f"quality {self.quality.settings['name']}" + (" (pinned)" if self.quality.pinned else ""),
+            ]
+            if self.latency is not None:
+                l50, l95, _ = self.latency.percentiles()
+                self.overlay_lines.append(f"latency p50 {l50:.1f}  p95 {l95:.1f} ms ({self.pacer})")
+            cap = self.capture
+            if cap is not None:
+                self.overlay_lines.append(f"capture {cap.written}/{cap.frames}  buffer {cap.backlog()}/{cap.slots}"
+                                          f"  dropped {cap.dropped}")
+            # เวลาแต่ละขั้น: โหมดเธรดเดียวเฟรม ~ sim + render, โหมด pipeline ~ max(sim, render) + wait
+            sim, render = prof.phase_mean("stage.sim"), prof.phase_mean("stage.render")
+            line = f"sim {sim:.2f}  render {render:.2f} ms"
+            if self.pipelined and prof.frame_times:
+                frame = sum(prof.frame_times) / len(prof.frame_times) * 1000.0
+                line += f"  wait {prof.phase_mean('stage.wait'):.2f}  overlap x{(sim + render) / frame:.2f}"
+            self.overlay_lines.append(line)
+            room = 9 - len(self.overlay_lines)
+            self.overlay_lines += [f"{name}  {ms:.2f} ms" for name, ms in prof.phase_means()[:room]]
+        if self.overlay_box is None:
+            # อบพื้นกล่องครั้งเดียว (ตัววาด texture จะได้ไม่ต้องอัพโหลดใหม่ทุกเฟรม)
+            self.overlay_box = pygame.Surface(OVERLAY_RECT.size, pygame.SRCALPHA)
+            self.overlay_box.fill((255, 255, 255, 215))
+        surf.blit(self.overlay_box, OVERLAY_RECT)
+        for i, line in enumerate(self.overlay_lines):
+            draw_text(surf, line, 20, OVERLAY_RECT.x + 8, OVERLAY_RECT.y + 4 + i*20, center=False)
+
+    def handle_event(self, event):
+        # คืน False เมื่อผู้เล่นปิดหน้าต่าง
+        if event.type == pygame.QUIT:
+            return False
+        if event.type != pygame.KEYDOWN:
+            return True
+        if event.key == pygame.K_F3:
+            self.profiler.toggle()
+        elif event.key == pygame.K_F4 and not self.profiler.capture_left:
+            self.profiler.start_capture()
+        if self.state == "menu":
+            if event.key == pygame.K_RETURN:
+                self.begin_run()
+                # เริ่มเล่น background music ถ้ามี
+                try:
+                    if self.music_loaded and not pygame.mixer.music.get_busy():
+                        pygame.mixer.music.play(-1)
+                except Exception:
+                    pass
+            elif event.key == pygame.K_c and self.has_quicksave:
+                if self.load_quicksave():
+                    try:
+                        if self.music_loaded and not pygame.mixer.music.get_busy():
+                            pygame.mixer.music.play(-1)
+                    except Exception:
+                        pass
+        elif self.state == "playing":
+            if event.key == pygame.K_p:
+                self.state = "pause"
+                if self.recorder is not None:
+                    self.recorder.note_pause()
+                self.quicksave()
+            elif event.key == pygame.K_r:
+                self.rewind_back()
+        elif self.state == "pause":
+            if event.key == pygame.K_p:
+                self.state = "playing"
+            elif event.key == pygame.K_r:
+                self.rewind_back()
+                self.quicksave()
+            elif event.key == pygame.K_ESCAPE:
+                self.stop_recording()
+                self.reset()
+        elif self.state == "gameover":
+            if event.key == pygame.K_RETURN:
+                # เริ่มใหม่ทันที (เก็บ highscore ก่อน)
+                hs = self.highscore
+                self.reset()
+                self.highscore = hs
+                self.begin_run()
+                # เริ่มเล่นเพลงอีกครั้งถ้ามี
+                try:
+                    if self.music_loaded and not pygame.mixer.music.get_busy():
+                        pygame.mixer.music.play(-1)
+                except Exception:
+                    pass
+            elif event.key == pygame.K_ESCAPE:
+                self.reset()
+        # Toggle วิธีเล็ง
+        if event.key == pygame.K_m:
+            self.aim_with_mouse = not self.aim_with_mouse
+        return True
+
+    def simulate(self, view, inp, steps, alpha):
+        # งานบนเธรดจำลอง (โหมด pipeline): เดินเกม steps รอบด้วยอินพุตเดียวกัน แล้วถ่ายผลลงสำเนาให้เฟรมถัดไปวาด
+        prof = self.profiler
+        with prof.span("stage.sim"):
+            for _ in range(steps):
+                if self.state != "playing":
+                    break
+                self.update_playing(inp)
+            with prof.span("capture"):
+                view.capture(self, alpha if self.state == "playing" else 1.0)
+
+    def first_frame_shown(self, start, font_time):
+        # ฟอนต์เปิดตอนวาดตัวหนังสือครั้งแรก (ในเฟรมแรก) แยกเวลาออกมาจากการวาด
+        now = time.perf_counter()
+        font_time = text_cache.load_time - font_time
+        STARTUP.add("font" + (" (SysFont)" if text_cache.font_file is None else ""), font_time)
+        STARTUP.add("first frame", now - start - font_time)
+        if self.startup_trace:
+            print(STARTUP.report(now))
+            if self.assets is not None:
+                finished, total = self.assets.progress()
+                print(f"  (เสียงยังโหลดเบื้องหลังต่อ เสร็จแล้ว {finished}/{total})")
+
+    def run(self, fps=FPS, time_scale=1.0):
+        # fps = เพดานเฟรมเรตการวาด (0 = ไม่จำกัด), time_scale > 1 = เร่งเวลาเกม
+        with STARTUP.span("init display"):
+            screen = init_display(self.renderer, self.window_size, self.software_renderer)
+        textured = isinstance(screen, TextureScreen)
+        if textured:
+            self.render_mode = "full"  # วาดใหม่ทั้งจอทุกเฟรมอยู่แล้ว โหมด dirty rect ไม่มีประโยชน์
+        if self.sound:
+            with STARTUP.span("assets: queue sounds"):
+                self.load_sounds()
+        with STARTUP.span("assets: sprites"):
+            prebake_sprites()
+            if textured:
+                # อัพโหลดสไปรท์ที่อบไว้ทั้งหมดเป็น texture ก่อนเริ่ม
+                for img, _ in atlas.sprites.values():
+                    screen.texture(img)
+                screen.texture(static_background())
+        font_time = text_cache.load_time
+        first_frame = time.perf_counter()
         running = True
-        aim_with_mouse = True  # เริ่มต้นเล็งด้วยเมาส์
+        accumulator = 0.0
+        last = time.perf_counter()
+        prof = self.profiler
+        quality = self.quality
+        quality.budget = 1.0 / (fps or FPS)
+        events = EventQueue()
+        pacer = FramePacer(fps, self.pacer, events, clock)
+        latency = self.latency
+        if latency is not None:
+            latency.start()
+        # โหมด pipeline: สำเนาโลกสองชุด ชุดหนึ่งให้วาด อีกชุดให้เธรดจำลองเขียน
+        pipe = Pipeline(WorldView(), WorldView()) if self.pipelined else None
+        fresh = False  # front ตรงกับเกมตอนนี้ไหม (เพิ่งจำลองเสร็จ และไม่มีอีเวนต์มาเปลี่ยนอะไรหลังจากนั้น)
 
         while running:
-            dt = clock.tick(FPS)
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    if self.state == "menu":
-                        if event.key == pygame.K_RETURN:
-                            self.state = "playing"
-                            # เริ่มเล่น background music ถ้ามี
-                            try:
-                                if self.music_loaded and not pygame.mixer.music.get_busy():
-                                    pygame.mixer.music.play(-1)
-                            except Exception:
-                                pass
-                    elif self.state == "playing":
-                        if event.key == pygame.K_p:
-                            self.state = "pause"
-                    elif self.state == "pause":
-                        if event.key == pygame.K_p:
-                            self.state = "playing"
-                        elif event.key == pygame.K_ESCAPE:
-                            self.reset()
-                    elif self.state == "gameover":
-                        if event.key == pygame.K_RETURN:
-                            # เริ่มใหม่ทันที (เก็บ highscore ก่อน)
-                            hs = self.highscore
-                            self.reset()
-                            self.highscore = hs
-                            self.state = "playing"
-                            # เริ่มเล่นเพลงอีกครั้งถ้ามี
-                            try:
-                                if self.music_loaded and not pygame.mixer.music.get_busy():
-                                    pygame.mixer.music.play(-1)
-                            except Exception:
-                                pass
-                        elif event.key == pygame.K_ESCAPE:
-                            self.reset()
-                    # Toggle วิธีเล็ง
-                    if event.key == pygame.K_m:
-                        aim_with_mouse = not aim_with_mouse
-
-            # อัพเดตสถานะเกม
-            if self.state == "playing":
-                self.update_playing()
-
-            # วาดภาพตาม state
-            if self.state == "menu":
-                self.draw_menu(screen)
+            pacer.wait()
+            # เวลาเฟรมของ profiler นับเฉพาะงานจริง ไม่รวมเวลานอนรอ
+            prof.begin_frame()
+            now = time.perf_counter()
+            frame_time = min(now - last, MAX_FRAME_TIME) * time_scale
+            last = now
+            if pipe is not None:
+                # รอจำลองของเฟรมก่อนให้เสร็จ ตั้งแต่ตรงนี้ถึง submit แตะสถานะเกมได้อย่างปลอดภัย
+                with prof.span("stage.wait"):
+                    fresh = pipe.wait() is not None
+                if fresh:
+                    pipe.front.follow(pipe.back)
+                    if latency is not None:
+                        latency.consumed()
+                # เสียงที่สั่งระหว่างจำลอง เล่นพร้อมภาพของรอบนั้น
+                self.audio.flush()
+            with prof.span("input"):
+                # อีเวนต์ตั้งแต่เฟรมก่อน (รวมที่ดึงไว้ระหว่างรอ) ตามลำดับเวลา
+                for stamp, event in events.drain():
+                    if latency is not None and latency.seen(event, stamp):
+                        continue
+                    if event.type == pygame.KEYDOWN:
+                        fresh = False  # ปุ่มอาจเปลี่ยนสถานะเกม (เริ่มรอบ ย้อนเวลา โหลด)
+                    running = self.handle_event(event) and running
+                # อ่านปุ่ม/เมาส์หลังดึงอีเวนต์รอบสุดท้าย แล้วเดินเกมทันที (ไม่มีงานอื่นคั่น)
+                inp = read_input() if self.state == "playing" else None
+
+            # อัพเดตสถานะเกมแบบ fixed timestep: สะสมเวลาจริงแล้วเดินทีละ dt
+            alpha = 1.0
+            steps = 0
+            view = None
+            if self.state == "playing" and pipe is not None:
+                # นับรอบแบบเดียวกับโหมดเธรดเดียว แล้วส่งไปเดินบนเธรดจำลอง (จบเกมกลางทางก็หยุดตรงนั้นเหมือนกัน)
+                accumulator += frame_time
+                while accumulator >= self.dt:
+                    accumulator -= self.dt
+                    steps += 1
+                if not fresh:
+                    with prof.span("capture"):
+                        pipe.front.capture(self, 1.0)
+                    self.dirty_valid = False
+                view = pipe.front
+                alpha = view.alpha
+                pipe.submit(self.simulate, inp, steps, accumulator / self.dt)
             elif self.state == "playing":
-                self.draw_playing(screen)
-            elif self.state == "pause":
-                self.draw_playing(screen)
-                self.draw_pause(screen)
-            elif self.state == "gameover":
-                self.draw_gameover(screen)
-
-            # ถ้าไม่เล็งด้วยเมาส์ ให้ซ่อนไอคอนเมาส์
-            pygame.mouse.set_visible(self.state != "playing" or aim_with_mouse)
-
-            pygame.display.flip()
-
+                accumulator += frame_time
+                with prof.span("stage.sim"):
+                    while accumulator >= self.dt and self.state == "playing":
+                        self.update_playing(inp)
+                        accumulator -= self.dt
+                        steps += 1
+                # เศษเวลาที่เหลือ ใช้วาดตำแหน่งระหว่างสองรอบจำลอง
+                alpha = accumulator / self.dt if self.state == "playing" else 1.0
+            else:
+                accumulator = 0.0
+            # (โหมด pipeline ระหว่างเล่น อินพุตมีผลตอนจำลองเสร็จ นับที่ wait() ของเฟรมถัดไป)
+            if latency is not None and view is None and (steps or self.state != "playing"):
+                latency.consumed()
+
+            # เสียงที่สั่งในเฟรมนี้ (ทุกรอบจำลอง) เล่นพร้อมกันทีเดียว
+            if pipe is None:
+                self.audio.flush()
+            with prof.span("stage.render"):
+                if textured:
+                    screen.clear()
+                rects = self.draw_frame(screen, alpha, view)
+
+                # ถ้าไม่เล็งด้วยเมาส์ ให้ซ่อนไอคอนเมาส์
+                pygame.mouse.set_visible(self.view.state != "playing" or self.aim_with_mouse)
+
+                if self.capture is not None:
+                    # ภาพเดียวกับที่กำลังจะขึ้นจอ (ตัววาด texture อ่านกลับจาก renderer ต้องทำก่อน present)
+                    with prof.span("grab"):
+                        self.capture.grab(screen.snapshot() if textured else screen)
+                with prof.span("flip"):
+                    if textured:
+                        screen.present()
+                    elif rects is None:
+                        pygame.display.flip()
+                    elif rects:
+                        pygame.display.update(rects)
+            if latency is not None:
+                latency.presented()
+            if first_frame is not None:
+                self.first_frame_shown(first_frame, font_time)
+                first_frame = None
+                running = running and not self.startup_trace
+            # งานที่ไม่เกี่ยวกับเฟรมนี้ทำหลังขึ้นจอแล้ว
+            self.sync_assets()
+            prof.end_frame(self.entity_counts() if prof.capture_left else None)
+            # เวลาทำงานของเฟรมนี้ (ไม่รวมนอนรอใน clock.tick) ส่งให้ตัวปรับคุณภาพ
+            if self.view.state == "playing" and quality.record(time.perf_counter() - now):
+                self.dirty_valid = False  # ชั้นดาว/พาร์ติเคิลที่วาดเปลี่ยน วาดเต็มจอใหม่หนึ่งเฟรม
+
+        if pipe is not None:
+            pipe.close()  # รอบจำลองที่ค้างอยู่ให้จบก่อน (เซฟ/quicksave ด้านล่างอ่านสถานะเกม)
+        self.stop_recording()
+        if self.capture is not None:
+            self.capture.close()  # รอเธรดเขียนภาพที่ค้างในบัฟเฟอร์ให้หมด
+        if latency is not None:
+            latency.stop()
+            print(latency.report())
+        # ปิดเกมกลางรอบ: เก็บไว้เล่นต่อครั้งหน้า
+        if self.state in ("playing", "pause"):
+            self.quicksave()
+        if self.store is not None:
+            self.store.close()  # รอเขียนเซฟที่ค้างให้เสร็จก่อนปิด
         # ก่อนจบ ให้หยุดเพลง
         try:
             pygame.mixer.music.stop()
@@ -589,5 +1479,125 @@ class Game:
         pygame.quit()
 
 
+def run_headless(seed, frames, policy=None):
+    # จำลองเกมโดยไม่เปิดหน้าต่าง policy(game) -> InputState (None = ไม่กดอะไร)
+    game = Game(seed=seed, headless=True)
+    game.start()
+    for _ in range(frames):
+        inp = policy(game) if policy else NO_INPUT
+        if game.step(inp) != "playing":
+            break
+    return game
+
+
+def run_replay(path):
+    # เล่นซ้ำไฟล์ replay เร็วที่สุดเท่าที่ทำได้ (ไม่วาด ไม่มีเสียง) คืน (game, reader)
+    reader = ReplayReader(path)
+    game = Game(seed=reader.seed, headless=True, sim_hz=reader.sim_hz)
+    game.start()
+    for run, flags, aim in reader.runs():
+        inp = InputState(aim=aim, **input_fields(flags))
+        for _ in range(run):
+            if game.step(inp) != "playing":
+                break
+    return game, reader
+
+
+def verify_replay(path):
+    # True = ผลเล่นซ้ำตรงกับที่บันทึกไว้
+    game, reader = run_replay(path)
+    print(f"{path}: seed {reader.seed}  รอบจำลอง {game.ticks}  คะแนน {game.score}  เลเวล {game.level}")
+    if reader.digest is None:
+        print("  ไฟล์ไม่สมบูรณ์ (เกมปิดกลางทาง) ไม่มีผลให้ตรวจ")
+        return False
+    ok = (game.ticks == reader.ticks and game.score == reader.score
+          and game.level == reader.level and game.state_digest() == reader.digest)
+    if ok:
+        print("  ตรงกับที่บันทึกไว้")
+    else:
+        print(f"  ไม่ตรง! บันทึกไว้: รอบ {reader.ticks} คะแนน {reader.score} เลเวล {reader.level}")
+    return ok
+
+
+STARTUP.add("import game modules", time.perf_counter() - PYGAME_IMPORTED)
+
+
 if __name__ == "__main__":
-    Game().run()
+    import argparse
+    parser = argparse.ArgumentParser(description="Cute Shooter")
+    parser.add_argument("--dirty", action="store_true",
+                        help="วาด/อัพเดตจอเฉพาะส่วนที่เปลี่ยน (เหมาะกับเครื่องไม่มี GPU หรือรีโมตเดสก์ท็อป)")
+    parser.add_argument("--fps", type=int, default=FPS,
+                        help="เพดานเฟรมเรตการวาด (0 = ไม่จำกัด เช่นจอ 144/240 Hz)")
+    parser.add_argument("--tick", type=int, default=SIM_HZ,
+                        help="จำนวนรอบจำลองเกมต่อวินาที")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="ตัวคูณความเร็วเวลาในเกม (>1 = เร่ง)")
+    parser.add_argument("--profile", action="store_true",
+                        help="เปิดกล่องสถิติเวลาเฟรมตั้งแต่เริ่ม (กด F3 เปิด/ปิดได้ระหว่างเล่น)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="บันทึก Chrome trace ของช่วงแรกของเกมลงไฟล์นี้ (F4 = บันทึกช่วงถัดไประหว่างเล่น)")
+    parser.add_argument("--trace-frames", type=int, default=300)
+    parser.add_argument("--record", nargs="?", const="replays", metavar="DIR",
+                        help="บันทึก replay ทุกรอบเล่นลงโฟลเดอร์นี้ (ค่าเริ่มต้น replays)")
+    parser.add_argument("--quality", metavar="TIER",
+                        help="ล็อกระดับคุณภาพภาพ (0-3 หรือ high/medium/low/lowest) ไม่ปรับอัตโนมัติ")
+    parser.add_argument("--pacer", choices=PACERS, default="tick",
+                        help="จังหวะเฟรม: tick = clock.tick แบบเดิม, precise = นอน + วนรอจนถึงกำหนด (แม่นกว่า ใช้ CPU มากขึ้นนิด)")
+    parser.add_argument("--latency", action="store_true",
+                        help="วัด latency จากอินพุตถึงขึ้นจอ พิมพ์ percentile ตอนปิดเกม (ดูสดได้ใน overlay F3)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="จำลองเกมบนอีกเธรดซ้อนกับการวาด (ภาพช้ากว่าหนึ่งเฟรม ผลการเล่นเหมือนเดิมทุกอย่าง)")
+    parser.add_argument("--renderer", choices=RENDERERS, default="surface",
+                        help="surface = วาดลง Surface แล้ว flip (แบบเดิม), texture = ใช้ Texture ของ SDL ย่อ/ขยายตามหน้าต่าง")
+    parser.add_argument("--window", metavar="WxH",
+                        help="ขนาดหน้าต่างเริ่มต้นของตัววาด texture เช่น 1280x720 (เกมยังวาดที่ 900x600 แล้วย่อ/ขยาย)")
+    parser.add_argument("--software", action="store_true",
+                        help="ตัววาด texture: ใช้ตัววาดซอฟต์แวร์ของ SDL (เครื่องไม่มี GPU)")
+    parser.add_argument("--capture", metavar="FILE",
+                        help="จับภาพทุกเฟรมลงไฟล์ (แปลงเป็นภาพทีละเฟรมด้วย python frame_capture.py FILE DIR)")
+    parser.add_argument("--capture-buffer", type=int, default=32, metavar="N",
+                        help="จำนวนเฟรมที่พักรอเขียนดิสก์ได้ (900x600 ใช้ราว 2 MB ต่อเฟรม) เต็มแล้วเฟรมถัดไปจะถูกทิ้ง")
+    parser.add_argument("--mute", action="store_true",
+                        help="ปิดเสียงทั้งหมด (ไม่เปิด mixer ไม่โหลดไฟล์เสียง)")
+    parser.add_argument("--startup-trace", action="store_true",
+                        help="พิมพ์เวลาเปิดเกมแยกเป็นช่วง (import/init/asset/ฟอนต์/เฟรมแรก) แล้วปิดเกม")
+    parser.add_argument("--replay", metavar="FILE", nargs="+",
+                        help="เล่นซ้ำไฟล์ replay แบบไม่เปิดหน้าต่าง แล้วตรวจคะแนนกับที่บันทึกไว้")
+    args = parser.parse_args()
+    if args.replay:
+        import sys
+        sys.exit(0 if all([verify_replay(path) for path in args.replay]) else 1)
+    with STARTUP.span("init game"):
+        game = Game(render_mode="dirty" if args.dirty else "full", sim_hz=args.tick, sound=not args.mute)
+    game.startup_trace = args.startup_trace
+    if args.profile:
+        game.profiler.toggle()
+    if args.trace:
+        game.profiler.start_capture(args.trace_frames, args.trace)
+    game.replay_dir = args.record
+    game.pacer = args.pacer
+    game.pipelined = args.pipeline
+    game.renderer = args.renderer
+    game.software_renderer = args.software
+    if args.window:
+        try:
+            game.window_size = tuple(int(v) for v in args.window.lower().split("x"))
+        except ValueError:
+            game.window_size = None
+        if game.window_size is None or len(game.window_size) != 2 or min(game.window_size) <= 0:
+            parser.error(f"--window ต้องเป็นแบบ 1280x720 (ได้ {args.window})")
+    if args.renderer != "texture" and (args.window or args.software):
+        parser.error("--window และ --software ใช้กับ --renderer texture เท่านั้น")
+    if args.capture:
+        if args.capture_buffer < 1:
+            parser.error("--capture-buffer ต้องมากกว่า 0")
+        game.capture = FrameCapture(args.capture, (WIDTH, HEIGHT), args.capture_buffer)
+    if args.latency:
+        game.latency = LatencyMeter()
+    if args.quality is not None:
+        try:
+            game.quality.pin(args.quality)
+        except ValueError as e:
+            parser.error(str(e))
+    game.run(fps=args.fps, time_scale=args.speed)
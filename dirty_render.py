@@ -0,0 +1,101 @@
+import numpy as np
+import pygame
+
+# --- ตัวติดตามพื้นที่ที่เปลี่ยน (dirty rectangles) แบบตาราง tile ---
+# แบ่งจอเป็น tile ขนาดเท่ากัน ทุกอย่างที่วาดในเฟรมนี้ (และที่เคยวาดเฟรมก่อน)
+# จะทำเครื่องหมาย tile ที่ทับไว้ แล้วค่อยคืนพื้นหลัง/วาด/อัพเดตจอเฉพาะ tile เหล่านั้น
+# ถ้าพื้นที่สกปรกเกินสัดส่วนที่ตั้งไว้ ให้ผู้เรียกวาดเต็มจอแทน
+
+
+class DirtyTiles:
+    def __init__(self, width, height, tile=32, full_ratio=0.5):
+        self.width = width
+        self.height = height
+        self.tile = tile
+        self.cols = (width + tile - 1) // tile
+        self.rows = (height + tile - 1) // tile
+        self.full_ratio = full_ratio
+        self.marks = np.zeros((self.rows, self.cols), dtype=bool)
+        # สิ่งที่วาดเฟรมที่แล้ว ต้องลบ (คืนพื้นหลัง) ในเฟรมนี้
+        self.prev = np.zeros((self.rows, self.cols), dtype=bool)
+        self.drawn = np.zeros((self.rows, self.cols), dtype=bool)
+
+    def begin(self):
+        self.marks[:] = self.prev
+        self.drawn[:] = False
+
+    def mark_boxes(self, x0, y0, x1, y1, drawn=True):
+        # กล่อง [x0, x1) x [y0, y1) หลายกล่องพร้อมกัน (array) ต้องกว้าง/สูงไม่เกิน 2 tile
+        x0 = np.asarray(x0)
+        if x0.size == 0:
+            return
+        t = self.tile
+        y0 = np.asarray(y0)
+        x1 = np.asarray(x1) - 1
+        y1 = np.asarray(y1) - 1
+        cols = [np.clip(px // t, 0, self.cols - 1) for px in (x0, (x0 + x1) // 2, x1)]
+        rows = [np.clip(py // t, 0, self.rows - 1) for py in (y0, (y0 + y1) // 2, y1)]
+        target = self.drawn if drawn else self.marks
+        for cy in rows:
+            for cx in cols:
+                target[cy, cx] = True
+
+    def mark_rects(self, rects, drawn=True):
+        if not rects:
+            return
+        a = np.array([(r[0], r[1], r[0] + r[2], r[1] + r[3]) for r in rects], dtype=np.int32)
+        self.mark_boxes(a[:, 0], a[:, 1], a[:, 2], a[:, 3], drawn)
+
+    def mark_rect(self, rect, drawn=False):
+        # สี่เหลี่ยมใหญ่ขนาดไหนก็ได้ (ใช้กับ HUD)
+        t = self.tile
+        x0 = max(0, rect[0] // t)
+        y0 = max(0, rect[1] // t)
+        x1 = min(self.cols - 1, (rect[0] + rect[2] - 1) // t)
+        y1 = min(self.rows - 1, (rect[1] + rect[3] - 1) // t)
+        if x1 >= x0 and y1 >= y0:
+            (self.drawn if drawn else self.marks)[y0:y1 + 1, x0:x1 + 1] = True
+
+    def touches(self, rect):
+        t = self.tile
+        x0 = max(0, rect[0] // t)
+        y0 = max(0, rect[1] // t)
+        x1 = min(self.cols - 1, (rect[0] + rect[2] - 1) // t)
+        y1 = min(self.rows - 1, (rect[1] + rect[3] - 1) // t)
+        if x1 < x0 or y1 < y0:
+            return False
+        region = slice(y0, y1 + 1), slice(x0, x1 + 1)
+        return bool(self.marks[region].any() or self.drawn[region].any())
+
+    def settle(self):
+        # รวมของที่จะวาดเฟรมนี้เข้ากับของที่ต้องลบ แล้วจำไว้ลบเฟรมหน้า
+        self.marks |= self.drawn
+        self.prev[:] = self.drawn
+
+    def too_dirty(self):
+        return (self.marks | self.drawn).mean() > self.full_ratio
+
+    def rects(self):
+        # รวม tile ติดกันในแถวเป็นช่วงยาว แล้วรวมแถวที่ช่วงเหมือนกันต่อกันเป็นก้อนเดียว
+        t = self.tile
+        out = []
+        open_runs = {}
+        for row in range(self.rows):
+            line = self.marks[row]
+            runs = []
+            if line.any():
+                edges = np.flatnonzero(np.diff(np.concatenate(([0], line.view(np.int8), [0]))))
+                runs = list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+            next_open = {}
+            for run in runs:
+                if run in open_runs:
+                    next_open[run] = open_runs.pop(run)
+                else:
+                    next_open[run] = row
+            for (c0, c1), r0 in open_runs.items():
+                out.append(pygame.Rect(c0 * t, r0 * t, (c1 - c0) * t, (row - r0) * t))
+            open_runs = next_open
+        for (c0, c1), r0 in open_runs.items():
+            out.append(pygame.Rect(c0 * t, r0 * t, (c1 - c0) * t, (self.rows - r0) * t))
+        bounds = pygame.Rect(0, 0, self.width, self.height)
+        return [r.clip(bounds) for r in out]
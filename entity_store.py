@@ -0,0 +1,107 @@
+import numpy as np
+
+# --- ที่เก็บเอนทิตีแบบ structure-of-arrays ---
+# เอนทิตีชนิดเดียวกัน (กระสุน ศัตรู ไอเทม) เก็บเป็น numpy array ต่อ field เรียงติดกัน
+# อัพเดต/ชน/ตัดของที่ออกนอกจอทีละทั้งชนิดด้วย array ไม่กี่คำสั่ง แทนการวนทีละอ็อบเจกต์
+#
+# ตัวที่ตายแล้วแค่ทำเครื่องหมายไว้ แล้ว compact() ทีเดียวตอนจบช่วง โดยคงลำดับเดิม
+# (ลำดับมีผลกับผลการชนและลำดับการสุ่ม จึงใช้ swap-compaction แบบพาร์ติเคิลไม่ได้)
+# ความจุเริ่มต้นจองไว้ก่อน เต็มเมื่อไหร่ค่อยขยายเท่าตัว ช่วงเล่นปกติจึงไม่จองหน่วยความจำใหม่
+
+
+def round_half_away(v):
+    # ปัดแบบเดียวกับ pygame.Rect.center = (float, float) (ครึ่งหนึ่งปัดออกจากศูนย์)
+    a = np.abs(v)
+    r = np.floor(a)
+    r += (a - r) >= 0.5
+    return np.copysign(r, v).astype(np.int32)
+
+
+class EntityStore:
+    def __init__(self, fields, capacity=256):
+        # fields = {ชื่อ: dtype} ; แต่ละชื่อกลายเป็น array ความยาวเท่าความจุ ใช้ได้แค่ [:len(store)]
+        self.fields = dict(fields)
+        self.capacity = capacity
+        self.count = 0
+        for name, dtype in self.fields.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.dead = np.zeros(capacity, dtype=bool)
+        self.dead_count = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+        self.dead[:] = False
+        self.dead_count = 0
+
+    def grow(self):
+        self.capacity *= 2
+        for name in list(self.fields) + ["dead"]:
+            old = getattr(self, name)
+            arr = np.zeros(self.capacity, dtype=old.dtype)
+            arr[:self.count] = old[:self.count]
+            setattr(self, name, arr)
+
+    def add(self, **values):
+        # เพิ่มหนึ่งตัวท้ายสุด คืน index ; field ที่ไม่ได้ส่งมาเป็น 0
+        if self.count == self.capacity:
+            self.grow()
+        i = self.count
+        for name, value in values.items():
+            getattr(self, name)[i] = value
+        for name in self.fields:
+            if name not in values:
+                getattr(self, name)[i] = 0
+        self.count += 1
+        return i
+
+    def copy_from(self, other):
+        # คัดลอกทุกตัวจาก store ชนิดเดียวกัน (ทำสำเนาไว้ให้เธรดหลักวาด ดู pipeline.py)
+        n = other.count
+        while self.capacity < n:
+            self.grow()
+        for name in self.fields:
+            getattr(self, name)[:n] = getattr(other, name)[:n]
+        self.count = n
+
+    def kill(self, i):
+        # ทำเครื่องหมายตาย (ยังอยู่ใน array จนกว่าจะ compact) ; ตายซ้ำได้ไม่เป็นไร
+        if not self.dead[i]:
+            self.dead[i] = True
+            self.dead_count += 1
+
+    def kill_mask(self, mask):
+        # mask ยาวเท่า len(store)
+        n = self.count
+        self.dead[:n] |= mask
+        self.dead_count = int(np.count_nonzero(self.dead[:n]))
+
+    def rows(self, *names):
+        # ทูเพิลต่อตัว (ค่าแบบ Python) ใช้ทำ digest / debug
+        n = self.count
+        return list(zip(*(getattr(self, name)[:n].tolist() for name in names)))
+
+    def positions(self, alpha=1.0):
+        # ตำแหน่งระหว่างรอบจำลองก่อนหน้า (px, py) กับรอบล่าสุด (x, y) ใช้วาดแบบ interpolate
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        if alpha >= 1.0:
+            return x, y
+        px, py = self.px[:n], self.py[:n]
+        return px + (x - px) * alpha, py + (y - py) * alpha
+
+    def compact(self):
+        # ลบตัวที่ตายทั้งหมด คงลำดับของตัวที่เหลือ
+        if not self.dead_count:
+            return
+        n = self.count
+        keep = np.flatnonzero(~self.dead[:n])
+        k = keep.size
+        for name in self.fields:
+            arr = getattr(self, name)
+            arr[:k] = arr[keep]
+        self.dead[:n] = False
+        self.dead_count = 0
+        self.count = k
@@ -0,0 +1,266 @@
+import os
+import sys
+import time
+import zlib
+import queue
+import struct
+import argparse
+import threading
+
+import numpy as np
+import pygame
+
+# --- จับภาพเกมลงไฟล์ (--capture) ---
+# ทุกเฟรมก่อน flip ก๊อปพิกเซลของจอผ่าน buffer view (ไม่ผ่าน image.save ไม่แปลงสี) ลงช่องว่างใน
+# ring buffer ที่จองไว้ตั้งแต่ต้น = memcpy ครั้งเดียว (~0.2 ms ที่ 900x600) แล้วส่งเลขช่องให้เธรดเขียน
+# เธรดเขียน XOR กับเฟรมก่อนหน้า (ส่วนที่ไม่เปลี่ยนกลายเป็นศูนย์) บีบด้วย zlib แล้วต่อท้ายไฟล์
+# ทุก KEY_EVERY เฟรมเขียนเฟรมเต็มหนึ่งครั้ง ไฟล์ที่ขาดกลางทาง (เกมดับ) ยังอ่านได้ถึงเฟรมสุดท้ายที่ครบ
+#
+# ดิสก์/เธรดเขียนช้ากว่าเกมจนช่องเต็ม: เฟรมนั้นถูกทิ้ง (เกมไม่รอ) พิมพ์เตือนตอนเริ่มทิ้ง และนับไว้ในสรุป
+# เลขเฟรมในไฟล์นับทุกเฟรมที่เกมวาด เฟรมที่ทิ้งจึงเห็นเป็นช่องว่างของเลข
+#
+# แปลงเป็นภาพทีละเฟรม (ทำทีหลังได้ ไม่ต้องเปิดเกม):
+#   python frame_capture.py capture.csfc frames/            # frames/frame_000000.png ...
+#   python frame_capture.py capture.csfc frames/ --fill     # เติมเฟรมที่ทิ้งด้วยภาพก่อนหน้า (เลขต่อเนื่อง ใช้ทำวิดีโอ)
+#
+# รูปแบบไฟล์ (little-endian):
+#   หัวไฟล์  b"CSFC" | version u8 | width u16 | height u16 | bytes/pixel u8 | shift ของ R G B u8 x3
+#   เฟรม    เลขเฟรม u32 | วินาทีนับจากเริ่มจับ f64 | ชนิด u8 (0 = เต็ม, 1 = XOR กับเฟรมก่อน) | ยาว u32 | ข้อมูล zlib
+# bytes/pixel = 4: ข้อมูลคือพิกเซลดิบของจอ (uint32 ต่อพิกเซล แยกสีด้วย shift)
+# bytes/pixel = 3: จอที่ไม่ใช่ 32 บิต เก็บเป็น RGB เรียงแถว (ช้ากว่า ต้องแปลงทุกเฟรม)
+
+MAGIC = b"CSFC"
+VERSION = 1
+HEADER = struct.Struct("<4sBHHBBBB")
+FRAME = struct.Struct("<IdBI")
+KEY = 0
+DELTA = 1
+KEY_EVERY = 300  # เฟรมเต็มทุก 5 วินาทีที่ 60 fps
+WARN_EVERY = 2.0  # วินาที ; ช่องเต็มต่อเนื่องก็เตือนไม่ถี่กว่านี้
+
+
+class CaptureError(Exception):
+    pass
+
+
+class FrameCapture:
+    def __init__(self, path, size, slots=32, level=1):
+        self.path = path
+        self.size = tuple(size)
+        self.slots = slots
+        self.level = level
+        self.ring = None  # จองตอนเห็นเฟรมแรก (รู้รูปแบบพิกเซลของจอแล้ว)
+        self.free = queue.Queue()
+        self.ready = queue.Queue()
+        self.thread = None
+        self.f = None
+        self.start = None
+        self.frames = 0     # เฟรมที่เกมส่งมา
+        self.written = 0    # เฟรมที่เขียนลงไฟล์แล้ว
+        self.dropped = 0
+        self.overflows = 0  # จำนวนช่วงที่ช่องเต็ม
+        self.overflowing = False
+        self.warned = None  # เวลาที่เตือนครั้งล่าสุด
+        self.bytes = 0
+        self.error = None
+
+    def open(self, surf):
+        w, h = self.size
+        if surf.get_size() != self.size:
+            raise CaptureError(f"ขนาดภาพ {surf.get_size()} ไม่ตรงกับที่ตั้งไว้ {self.size}")
+        if surf.get_bytesize() == 4 and surf.get_losses()[:3] == (0, 0, 0):
+            self.bpp = 4
+            shifts = surf.get_shifts()[:3]
+            self.ring = np.empty((self.slots, h, w), dtype=np.uint32)
+        else:
+            self.bpp = 3
+            shifts = (0, 8, 16)
+            self.ring = np.empty((self.slots, h, w, 3), dtype=np.uint8)
+        self.prev = np.zeros_like(self.ring[0])
+        self.diff = np.empty_like(self.ring[0])
+        for i in range(self.slots):
+            self.free.put(i)
+        dirname = os.path.dirname(self.path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        self.f = open(self.path, "wb")
+        self.f.write(HEADER.pack(MAGIC, VERSION, w, h, self.bpp, *shifts))
+        self.start = time.perf_counter()
+        self.thread = threading.Thread(target=self._work, name="capture-writer", daemon=True)
+        self.thread.start()
+
+    # --- เรียกจากลูปเกม ก่อน flip ---
+    def grab(self, surf):
+        if self.ring is None:
+            self.open(surf)
+        index = self.frames
+        self.frames += 1
+        try:
+            slot = self.free.get_nowait()
+        except queue.Empty:
+            # เขียนไม่ทัน: ทิ้งเฟรมนี้ ไม่หยุดรอ
+            self.dropped += 1
+            if not self.overflowing:
+                self.overflowing = True
+                self.overflows += 1
+            now = time.perf_counter()
+            if self.warned is None or now - self.warned >= WARN_EVERY:
+                self.warned = now
+                print(f"จับภาพ: บัฟเฟอร์ {self.slots} เฟรมเต็ม (เขียนดิสก์ไม่ทัน) ทิ้งเฟรมที่ {index}"
+                      f" (รวม {self.dropped} เฟรม)")
+            return False
+        self.overflowing = False
+        if self.bpp == 4:
+            # view ของพิกเซลดิบ (w, h) สลับแกนเป็น (h, w) ก็ตรงกับลำดับในหน่วยความจำ copyto จึงเป็น memcpy
+            np.copyto(self.ring[slot], np.asarray(surf.get_view("2")).T)
+        else:
+            np.copyto(self.ring[slot], pygame.surfarray.array3d(surf).transpose(1, 0, 2))
+        self.ready.put((slot, index, time.perf_counter() - self.start))
+        return True
+
+    def backlog(self):
+        return self.slots - self.free.qsize() if self.ring is not None else 0
+
+    def close(self):
+        if self.thread is not None:
+            self.ready.put(None)
+            self.thread.join()
+            self.thread = None
+            self.f.close()
+            self.f = None
+        print(self.report())
+
+    def report(self):
+        line = f"จับภาพ {self.written}/{self.frames} เฟรม -> {self.path} ({self.bytes / 1e6:.1f} MB)"
+        if self.dropped:
+            line += f"  ทิ้ง {self.dropped} เฟรมใน {self.overflows} ช่วง (บัฟเฟอร์เต็ม ลองเพิ่ม --capture-buffer)"
+        if self.error is not None:
+            line += f"  เขียนไม่ได้: {self.error}"
+        return line
+
+    # --- เธรดเขียน ---
+    def _work(self):
+        while True:
+            job = self.ready.get()
+            if job is None:
+                return
+            slot, index, t = job
+            try:
+                if self.error is None:
+                    self.write_frame(self.ring[slot], index, t)
+            except OSError as e:
+                self.error = e
+                print("เขียนไฟล์จับภาพไม่ได้:", e)
+            finally:
+                self.free.put(slot)
+
+    def write_frame(self, frame, index, t):
+        if self.written % KEY_EVERY == 0:
+            kind = KEY
+            data = zlib.compress(frame, self.level)
+        else:
+            kind = DELTA
+            np.bitwise_xor(frame, self.prev, out=self.diff)
+            data = zlib.compress(self.diff, self.level)
+        np.copyto(self.prev, frame)
+        self.f.write(FRAME.pack(index, t, kind, len(data)))
+        self.f.write(data)
+        self.written += 1
+        self.bytes += FRAME.size + len(data)
+
+
+# --- อ่านไฟล์ (ใช้ตอนแปลงเป็นภาพ) ---
+class CaptureReader:
+    def __init__(self, path):
+        self.path = path
+        self.f = open(path, "rb")
+        head = self.f.read(HEADER.size)
+        if len(head) < HEADER.size:
+            raise CaptureError(f"{path}: ไฟล์สั้นเกินไป")
+        magic, version, w, h, bpp, rs, gs, bs = HEADER.unpack(head)
+        if magic != MAGIC:
+            raise CaptureError(f"{path}: ไม่ใช่ไฟล์จับภาพของเกมนี้")
+        if version != VERSION:
+            raise CaptureError(f"{path}: ไฟล์เวอร์ชัน {version} (อ่านได้แค่ {VERSION})")
+        self.size = (w, h)
+        self.bpp = bpp
+        self.shifts = (rs, gs, bs)
+
+    def frames(self):
+        # คืน (เลขเฟรม, วินาที, ภาพ RGB แบบ (h, w, 3) uint8) ; หยุดเงียบ ๆ ที่เฟรมที่เขียนไม่ครบ
+        w, h = self.size
+        shape = (h, w) if self.bpp == 4 else (h, w, 3)
+        dtype = np.uint32 if self.bpp == 4 else np.uint8
+        frame = None
+        while True:
+            head = self.f.read(FRAME.size)
+            if len(head) < FRAME.size:
+                return
+            index, t, kind, length = FRAME.unpack(head)
+            data = self.f.read(length)
+            if len(data) < length:
+                return
+            try:
+                pixels = np.frombuffer(zlib.decompress(data), dtype=dtype).reshape(shape)
+            except (zlib.error, ValueError):
+                return
+            if kind == KEY:
+                frame = pixels.copy()
+            elif frame is None:
+                raise CaptureError(f"{self.path}: เฟรม {index} อ้างถึงเฟรมก่อนหน้าที่ไม่มี")
+            else:
+                frame ^= pixels
+            yield index, t, self.rgb(frame)
+
+    def rgb(self, frame):
+        if self.bpp == 3:
+            return frame
+        out = np.empty(frame.shape + (3,), dtype=np.uint8)
+        for i, shift in enumerate(self.shifts):
+            out[..., i] = frame >> shift
+        return out
+
+    def close(self):
+        self.f.close()
+
+
+def convert(path, out_dir, fill=False, ext="png"):
+    reader = CaptureReader(path)
+    os.makedirs(out_dir, exist_ok=True)
+    w, h = reader.size
+    count = missing = 0
+    last = None
+    t = 0.0
+    try:
+        for index, t, rgb in reader.frames():
+            img = pygame.image.frombuffer(rgb.tobytes(), (w, h), "RGB")
+            if last is not None and index > last[0] + 1:
+                missing += index - last[0] - 1
+                if fill:
+                    for gap in range(last[0] + 1, index):
+                        pygame.image.save(last[1], os.path.join(out_dir, f"frame_{gap:06d}.{ext}"))
+            pygame.image.save(img, os.path.join(out_dir, f"frame_{index:06d}.{ext}"))
+            last = (index, img)
+            count += 1
+    finally:
+        reader.close()
+    line = f"{path}: {count} เฟรม {w}x{h} ยาว {t:.2f} วินาที -> {out_dir}"
+    if missing:
+        line += f"  (เฟรมที่ถูกทิ้งตอนจับ {missing} เฟรม" + (" เติมด้วยภาพก่อนหน้าแล้ว)" if fill else ")")
+    print(line)
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="แปลงไฟล์จับภาพของ Cute Shooter (--capture) เป็นภาพทีละเฟรม")
+    parser.add_argument("capture", help="ไฟล์ .csfc")
+    parser.add_argument("out_dir", help="โฟลเดอร์ที่จะเขียนภาพลงไป")
+    parser.add_argument("--fill", action="store_true",
+                        help="เติมเฟรมที่ถูกทิ้งด้วยภาพก่อนหน้า ให้เลขเฟรมต่อเนื่อง (เอาไปทำวิดีโอ fps คงที่)")
+    parser.add_argument("--format", choices=["png", "bmp", "tga", "jpg"], default="png")
+    args = parser.parse_args()
+    try:
+        convert(args.capture, args.out_dir, args.fill, args.format)
+    except (OSError, CaptureError) as e:
+        print(e)
+        sys.exit(1)
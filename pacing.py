@@ -0,0 +1,144 @@
+import time
+import random
+import threading
+
+import numpy as np
+import pygame
+
+# --- จังหวะเฟรมและอินพุต ---
+# FramePacer: รอให้ถึงเวลาเริ่มเฟรมถัดไป มีสองแบบ
+#   "tick"    = pygame.time.Clock.tick แบบเดิม (SDL_Delay นอนเกินได้ 1-2 ms และไม่รับอินพุตระหว่างนอน)
+#   "precise" = นอนจนเกือบถึงกำหนด แล้ววนรอช่วงสุดท้ายเอง (busy-wait) ระหว่างวนดึงอีเวนต์เข้าคิวไปด้วย
+#               เฟรมเริ่มตรงเวลา และอีเวนต์ได้เวลาประทับใกล้ตอนที่เข้ามาจริง
+# EventQueue: เก็บอีเวนต์พร้อมเวลาที่ดึงได้ เกมดึงรอบสุดท้ายหลังรอเสร็จ แล้วอ่านสถานะปุ่ม/เมาส์ทันที
+# ก่อนเดินเกม (อินพุตสดที่สุดเท่าที่ทำได้)
+#
+# LatencyMeter (--latency): เธรดแยกโพสต์อีเวนต์ทดสอบเข้าคิวของ SDL เป็นระยะแบบสุ่ม พร้อมเวลาที่โพสต์
+# นับจากตอนนั้นจนถึงตอน flip ของเฟรมแรกที่อินพุตนั้นมีผลกับโลกในเกมแล้ว = input-to-present latency
+# ไม่ต้องมีคนกดจริง และวัดเทียบกันได้ทั้งสองแบบของ pacer
+
+PACERS = ["tick", "precise"]
+SPIN = 0.002        # วินาทีสุดท้ายก่อนกำหนดที่วนรอแทนการนอน
+POLL_EVERY = 0.0005  # ระหว่างวนรอ ดึงอีเวนต์ทุกเท่านี้
+
+
+class EventQueue:
+    def __init__(self):
+        self.items = []  # (เวลาที่ดึงได้, อีเวนต์)
+
+    def collect(self):
+        now = time.perf_counter()
+        self.items.extend((now, ev) for ev in pygame.event.get())
+
+    def drain(self):
+        self.collect()
+        items, self.items = self.items, []
+        return items
+
+
+class FramePacer:
+    def __init__(self, fps, mode="tick", events=None, clock=None):
+        self.mode = mode
+        self.period = 1.0 / fps if fps else 0.0
+        self.fps = fps
+        self.events = events
+        self.clock = clock or pygame.time.Clock()
+        self.deadline = None
+
+    def wait(self):
+        if self.mode == "tick" or not self.period:
+            self.clock.tick(self.fps)
+            return
+        now = time.perf_counter()
+        if self.deadline is None or now - self.deadline > self.period:
+            # ช้ากว่ากำหนดเกินหนึ่งเฟรม (เช่นลากหน้าต่าง) ไม่ต้องเร่งตามทัน เริ่มนับใหม่
+            self.deadline = now
+        else:
+            self.deadline += self.period
+        deadline = self.deadline
+        sleep = deadline - now - SPIN
+        if sleep > 0:
+            time.sleep(sleep)
+        events = self.events
+        next_poll = 0.0
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if events is not None and now >= next_poll:
+                events.collect()
+                next_poll = now + POLL_EVERY
+
+
+class LatencyMeter:
+    def __init__(self, min_gap=0.02, max_gap=0.08, seed=None):
+        self.event_type = pygame.event.custom_type()
+        self.min_gap = min_gap
+        self.max_gap = max_gap
+        self.rng = random.Random(seed)
+        self.waiting = []    # (เวลาเริ่ม, เป็นอีเวนต์ทดสอบไหม) ที่ดึงเข้าเกมแล้ว รอรอบจำลองถัดไป
+        self.in_flight = []  # ผ่านรอบจำลองแล้ว รอ flip
+        self.samples = []    # วินาที ของอีเวนต์ทดสอบ
+        # ปุ่ม/คลิกจริง นับจากเวลาที่ดึงอีเวนต์ได้ (ช้ากว่าตอนกดจริงได้ถึงช่วงที่ไม่ได้ดึง จึงแยกไว้)
+        self.input_samples = []
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._post, name="latency-probe", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def _post(self):
+        while self.running:
+            time.sleep(self.rng.uniform(self.min_gap, self.max_gap))
+            try:
+                pygame.event.post(pygame.event.Event(self.event_type, t=time.perf_counter()))
+            except pygame.error:
+                return
+
+    # --- เรียกจากลูปเกมตามลำดับของเฟรม ---
+    def seen(self, event, stamp):
+        # stamp = เวลาที่ดึงอีเวนต์ได้ ; คืน True ถ้าเป็นอีเวนต์ทดสอบ (เกมไม่ต้องสนใจต่อ)
+        if event.type == self.event_type:
+            self.waiting.append((event.t, True))
+            return True
+        if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
+            self.waiting.append((stamp, False))
+        return False
+
+    def consumed(self):
+        # อินพุตที่อ่านไว้มีผลกับการจำลองแล้ว (เดินเกมไปอย่างน้อยหนึ่งรอบ หรืออยู่หน้าเมนู)
+        self.in_flight.extend(self.waiting)
+        self.waiting.clear()
+
+    def presented(self):
+        now = time.perf_counter()
+        for t, probe in self.in_flight:
+            (self.samples if probe else self.input_samples).append(now - t)
+        self.in_flight.clear()
+
+    def percentiles(self, samples=None, qs=(50, 95, 99)):
+        samples = self.samples if samples is None else samples
+        if not samples:
+            return [0.0 for _ in qs]
+        a = np.asarray(samples, dtype=np.float64) * 1000.0
+        return [float(v) for v in np.percentile(a, qs)]
+
+    def report(self):
+        lines = []
+        for label, samples in (("input->present latency", self.samples),
+                               ("  real key/click (from poll time)", self.input_samples)):
+            if not samples and lines:
+                continue
+            p50, p95, p99 = self.percentiles(samples)
+            worst = max(samples) * 1000.0 if samples else 0.0
+            lines.append(f"{label} ({len(samples)} samples): "
+                         f"p50 {p50:.2f} ms  p95 {p95:.2f} ms  p99 {p99:.2f} ms  max {worst:.2f} ms")
+        return "\n".join(lines)
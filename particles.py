@@ -0,0 +1,167 @@
+import numpy as np
+import pygame
+
+# --- ระบบพาร์ติเคิลแบบ structure-of-arrays ---
+# เก็บตำแหน่ง ความเร็ว อายุ ขนาด และสีไว้ใน numpy array ความจุคงที่
+# อัพเดตทีเดียวทั้งก้อน ลบตัวที่ตายด้วยการย้ายตัวท้าย ๆ มาอุดรู (swap-compaction)
+# และวาดทีเดียวด้วย Surface.blits จากสไปรท์จุดที่อบไว้ล่วงหน้า
+# แต่ละตัวจำลำดับในการระเบิดของตัวเองไว้ (rank) ตอนเครื่องช้าจะวาดแค่ burst_cap ตัวแรกของแต่ละครั้ง
+
+GRAVITY = 180.0  # px/วินาที^2
+SIZE_SLOTS = 5  # ขนาดพาร์ติเคิล 0..4 px
+
+
+class ParticleSystem:
+    def __init__(self, capacity=32768, seed=None):
+        self.capacity = capacity
+        self.count = 0
+        self.np_rng = np.random.default_rng(seed)
+        self.x = np.zeros(capacity, dtype=np.float64)
+        self.y = np.zeros(capacity, dtype=np.float64)
+        # ตำแหน่งรอบก่อน ใช้ interpolate ตอนวาด
+        self.px = np.zeros(capacity, dtype=np.float64)
+        self.py = np.zeros(capacity, dtype=np.float64)
+        self.vx = np.zeros(capacity, dtype=np.float64)
+        self.vy = np.zeros(capacity, dtype=np.float64)
+        self.life = np.zeros(capacity, dtype=np.float64)  # วินาที
+        self.size = np.zeros(capacity, dtype=np.int32)
+        # สีเก็บเป็นเลขดัชนีของ palette จะได้หา sprite ได้เร็ว
+        self.color = np.zeros(capacity, dtype=np.int32)
+        self.rank = np.zeros(capacity, dtype=np.int32)  # ตัวที่เท่าไหร่ของการระเบิดครั้งนั้น
+        self.palette = []
+        self.palette_index = {}
+        self.sprites = []
+
+    def __len__(self):
+        return self.count
+
+    def clear(self, seed=None):
+        # ล้างโดยไม่จองใหม่ ; ส่ง seed มาเพื่อเริ่มลำดับสุ่มใหม่ตอนขึ้นรอบเล่นใหม่
+        self.count = 0
+        if seed is not None:
+            self.np_rng = np.random.default_rng(seed)
+
+    def color_id(self, color):
+        color = tuple(color)
+        cid = self.palette_index.get(color)
+        if cid is None:
+            cid = len(self.palette)
+            self.palette.append(color)
+            self.palette_index[color] = cid
+        return cid
+
+    def copy_from(self, other):
+        # สำเนาไว้วาด: เอาเฉพาะที่ draw/boxes ใช้ (ไม่เอาความเร็ว อายุ และตัวสุ่ม)
+        n = min(other.count, self.capacity)
+        for name in ("x", "y", "px", "py", "size", "color", "rank"):
+            getattr(self, name)[:n] = getattr(other, name)[:n]
+        self.count = n
+        if self.palette != other.palette[:len(self.palette)]:
+            # ตารางสีเริ่มใหม่ (โหลดสแนปช็อต) สไปรท์ที่อบไว้ใช้ไม่ได้แล้ว
+            self.palette, self.palette_index, self.sprites = [], {}, []
+        for color in other.palette[len(self.palette):]:
+            self.color_id(color)
+
+    def emit(self, x, y, color, n):
+        # เกิดพาร์ติเคิล n ตัวที่จุด (x, y) ถ้าเต็มความจุจะตัดส่วนเกินทิ้ง
+        n = min(n, self.capacity - self.count)
+        if n <= 0:
+            return 0
+        rng = self.np_rng
+        s = slice(self.count, self.count + n)
+        self.x[s] = self.px[s] = x
+        self.y[s] = self.py[s] = y
+        self.vx[s] = rng.uniform(-90, 90, n)
+        self.vy[s] = rng.uniform(-120, -30, n)
+        self.life[s] = rng.integers(20, 41, n) / 60
+        self.size[s] = rng.integers(2, 5, n)
+        self.color[s] = self.color_id(color)
+        self.rank[s] = np.arange(n)
+        self.count += n
+        return n
+
+    def update(self, dt):
+        n = self.count
+        if n == 0:
+            return
+        x, y, vx, vy, life = self.x[:n], self.y[:n], self.vx[:n], self.vy[:n], self.life[:n]
+        self.px[:n] = x
+        self.py[:n] = y
+        x += vx * dt
+        y += vy * dt
+        vy += GRAVITY * dt
+        life -= dt
+
+        dead = np.flatnonzero(life <= 1e-9)
+        if dead.size == 0:
+            return
+        keep = n - dead.size
+        # รูที่อยู่ช่วงหน้า เอาตัวที่ยังไม่ตายจากช่วงท้ายมาเติม
+        holes = dead[dead < keep]
+        if holes.size:
+            movers = np.flatnonzero(life[keep:] > 1e-9) + keep
+            for arr in (self.x, self.y, self.px, self.py, self.vx, self.vy, self.life, self.size, self.color,
+                        self.rank):
+                arr[holes] = arr[movers]
+        self.count = keep
+
+    def bake(self):
+        # อบสไปรท์จุดทุกสี x ทุกขนาด เก็บเป็นตาราง index = สี * SIZE_SLOTS + ขนาด
+        table = self.sprites
+        has_display = pygame.display.get_surface() is not None
+        for cid in range(len(table) // SIZE_SLOTS, len(self.palette)):
+            color = self.palette[cid]
+            key_col = (0, 0, 0) if color != (0, 0, 0) else (255, 0, 255)
+            for size in range(SIZE_SLOTS):
+                d = size * 2 + 1
+                img = pygame.Surface((d, d))
+                img.fill(key_col)
+                if size:
+                    pygame.draw.circle(img, color, (size, size), size)
+                if has_display:
+                    img = img.convert()
+                img.set_colorkey(key_col)
+                table.append(img)
+
+    def positions(self, alpha=1.0):
+        n = self.count
+        if alpha >= 1.0:
+            return self.x[:n], self.y[:n]
+        px, py = self.px[:n], self.py[:n]
+        return px + (self.x[:n] - px) * alpha, py + (self.y[:n] - py) * alpha
+
+    def visible(self, alpha=1.0, burst_cap=None):
+        # (x, y, size, color) ของตัวที่จะวาด
+        x, y = self.positions(alpha)
+        n = self.count
+        size, color = self.size[:n], self.color[:n]
+        if burst_cap is not None:
+            keep = self.rank[:n] < burst_cap
+            x, y, size, color = x[keep], y[keep], size[keep], color[keep]
+        return x, y, size, color
+
+    def draw(self, surf, alpha=1.0, burst_cap=None):
+        if self.count == 0:
+            return
+        if len(self.sprites) < len(self.palette) * SIZE_SLOTS:
+            self.bake()
+        x, y, size, color = self.visible(alpha, burst_cap)
+        # int() ตัดทศนิยมแบบเดียวกับ pygame.draw.circle(int(x), int(y)) เดิม
+        xs = (x.astype(np.int32) - size).tolist()
+        ys = (y.astype(np.int32) - size).tolist()
+        keys = (color * SIZE_SLOTS + size).tolist()
+        # ส่งเป็น iterator ไม่สร้างลิสต์ทูเพิลก้อนใหญ่ค้างไว้ (ลดงานของ GC)
+        surf.blits(zip(map(self.sprites.__getitem__, keys), zip(xs, ys)), False)
+
+    def boxes(self, alpha=1.0, burst_cap=None):
+        # กล่อง (x0, y0, x1, y1) ของสไปรท์แต่ละตัว ใช้ทำ dirty rect
+        x, y, size, _ = self.visible(alpha, burst_cap)
+        x0 = x.astype(np.int32) - size
+        y0 = y.astype(np.int32) - size
+        d = size * 2 + 1
+        return x0, y0, x0 + d, y0 + d
+
+    def state_items(self):
+        n = self.count
+        return [self.x[:n].tolist(), self.y[:n].tolist(), self.vx[:n].tolist(),
+                self.vy[:n].tolist(), self.life[:n].tolist()]
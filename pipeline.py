@@ -0,0 +1,66 @@
+import time
+import queue
+import threading
+
+# --- แยกการจำลองกับการวาดเป็นสองเธรด (--pipeline) ---
+# โหมดเธรดเดียว: เวลาเฟรม = จำลอง + วาด + flip ต่อกัน
+# โหมดนี้: ระหว่างที่เธรดหลักวาดผลของเฟรม N (front) เธรดจำลองเดินเกมของเฟรม N+1 ไปพร้อมกัน
+# แล้วถ่ายผลลงอีกชุด (back) ต้นเฟรมถัดไป wait() รอให้จำลองเสร็จแล้วสลับสองชุด
+# งาน blit ของ pygame และงาน numpy ปล่อย GIL ระหว่างทำ สองเธรดจึงทำงานซ้อนกันได้จริง
+#
+# การจำลองเหมือนโหมดเธรดเดียวทุกอย่าง (อินพุตเดิม จำนวนรอบเดิม ลำดับเดิม) แค่ภาพขึ้นจอช้ากว่าหนึ่งเฟรม
+# กติกา: อะไรที่แตะสถานะเกม (อีเวนต์ เซฟ เสียง) ทำได้เฉพาะตอนเธรดจำลองว่าง คือหลัง wait() ก่อน submit()
+# front ห้ามเขียนจากเธรดจำลอง back ห้ามอ่านจากเธรดหลักระหว่างที่มีงานค้าง
+
+
+class Pipeline:
+    def __init__(self, front, back):
+        self.front = front
+        self.back = back
+        self.jobs = queue.Queue()
+        self.done = queue.Queue()
+        self.busy = False
+        self.thread = None
+
+    def submit(self, fn, *args):
+        # fn(back, *args) บนเธรดจำลอง ; ต้อง wait() ก่อนส่งงานถัดไป
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._work, name="simulation", daemon=True)
+            self.thread.start()
+        self.busy = True
+        self.jobs.put((fn, args))
+
+    def wait(self):
+        # รองานที่ค้างให้เสร็จแล้วสลับ front/back ; คืน (เวลาเริ่ม, เวลาจบ) ของงาน หรือ None ถ้าไม่มีงานค้าง
+        if not self.busy:
+            return None
+        result = self.done.get()
+        self.busy = False
+        if isinstance(result, BaseException):
+            # เธรดจำลองพัง: โยนต่อบนเธรดหลัก เกมจะได้ไม่ค้างรอเงียบ ๆ
+            raise result
+        self.front, self.back = self.back, self.front
+        return result
+
+    def close(self):
+        if self.thread is not None:
+            try:
+                self.wait()
+            finally:
+                self.jobs.put(None)
+                self.thread.join()
+                self.thread = None
+
+    def _work(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            fn, args = job
+            start = time.perf_counter()
+            try:
+                fn(self.back, *args)
+            except BaseException as e:
+                self.done.put(e)
+                continue
+            self.done.put((start, time.perf_counter()))
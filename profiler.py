@@ -0,0 +1,178 @@
+import json
+import time
+import threading
+from collections import deque
+
+import numpy as np
+
+# --- ตัวจับเวลาในเฟรม (profiler) ---
+# ครอบแต่ละช่วงของเฟรมด้วย `with profiler.span("ชื่อ"):` เก็บสถิติย้อนหลังไว้โชว์บน overlay
+# และจับภาพช่วงหลายเฟรมออกมาเป็นไฟล์ Chrome trace (เปิดใน chrome://tracing หรือ Perfetto)
+# ตอนปิดอยู่ span() คืนอ็อบเจกต์ว่างตัวเดียวกันทุกครั้ง แทบไม่มีต้นทุน
+# span ที่จับจากเธรดจำลอง (โหมด --pipeline) ขึ้นเป็นอีกแถวใน trace จะเห็นว่าซ้อนกับการวาดตรงไหน
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("prof", "name", "start")
+
+    def __init__(self, prof, name):
+        self.prof = prof
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.prof.record(self.name, self.start, time.perf_counter())
+        return False
+
+
+class FrameProfiler:
+    def __init__(self, history=600):
+        self.enabled = False
+        self.history = history
+        self.frame_times = deque(maxlen=history)
+        self.phases = {}
+        self.frame_start = None
+        # Chrome trace
+        self.capture_left = 0
+        self.capture_path = None
+        self.events = []
+        self.origin = time.perf_counter()
+        self.frame_index = 0
+        self.main_thread = threading.get_ident()
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        if not self.enabled:
+            self.frame_times.clear()
+            self.phases.clear()
+
+    def span(self, name):
+        if not (self.enabled or self.capture_left):
+            return NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name, start, end):
+        if self.enabled:
+            d = self.phases.get(name)
+            if d is None:
+                d = self.phases[name] = deque(maxlen=self.history)
+            d.append(end - start)
+        if self.capture_left:
+            self.events.append({
+                "name": name, "ph": "X", "pid": 1, "tid": 1 if threading.get_ident() == self.main_thread else 2,
+                "ts": round((start - self.origin) * 1e6, 3),
+                "dur": round((end - start) * 1e6, 3),
+            })
+
+    # --- ขอบเฟรม ---
+    def begin_frame(self):
+        if self.enabled or self.capture_left:
+            self.frame_start = time.perf_counter()
+
+    def end_frame(self, counters=None):
+        if self.frame_start is None:
+            return
+        end = time.perf_counter()
+        start, self.frame_start = self.frame_start, None
+        self.frame_index += 1
+        if self.enabled:
+            self.frame_times.append(end - start)
+        if self.capture_left:
+            self.events.append({
+                "name": "frame", "ph": "X", "pid": 1, "tid": 1,
+                "ts": round((start - self.origin) * 1e6, 3),
+                "dur": round((end - start) * 1e6, 3),
+                "args": {"frame": self.frame_index},
+            })
+            if counters:
+                self.events.append({
+                    "name": "entities", "ph": "C", "pid": 1,
+                    "ts": round((end - self.origin) * 1e6, 3),
+                    "args": dict(counters),
+                })
+            self.capture_left -= 1
+            if self.capture_left == 0:
+                self.dump_trace()
+
+    # --- สถิติ ---
+    def percentiles(self, qs=(50, 95, 99)):
+        if not self.frame_times:
+            return [0.0 for _ in qs]
+        a = np.fromiter(self.frame_times, dtype=np.float64) * 1000.0
+        return [float(v) for v in np.percentile(a, qs)]
+
+    def phase_mean(self, name):
+        # ms เฉลี่ยของช่วงเดียว (0 ถ้ายังไม่มี)
+        d = self.phases.get(name)
+        return sum(d) / len(d) * 1000.0 if d else 0.0
+
+    def phase_means(self):
+        # ms เฉลี่ยของแต่ละช่วง เรียงจากแพงไปถูก (list() ก่อน เผื่อเธรดจำลองเพิ่มชื่อใหม่ระหว่างไล่)
+        out = [(name, sum(d) / len(d) * 1000.0) for name, d in list(self.phases.items()) if d]
+        out.sort(key=lambda item: item[1], reverse=True)
+        return out
+
+    # --- Chrome trace ---
+    def start_capture(self, frames=300, path=None):
+        self.events = []
+        self.capture_left = frames
+        self.capture_path = path or time.strftime("cute_shooter_trace_%Y%m%d_%H%M%S.json")
+
+    def dump_trace(self, path=None):
+        path = path or self.capture_path
+        data = {
+            "traceEvents": [
+                {"name": "thread_name", "ph": "M", "pid": 1, "tid": 1, "args": {"name": "main"}},
+                {"name": "thread_name", "ph": "M", "pid": 1, "tid": 2, "args": {"name": "simulation"}},
+            ] + self.events,
+            "displayTimeUnit": "ms",
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        print("บันทึก trace แล้ว:", path)
+        self.events = []
+        self.capture_left = 0
+        return path
+
+
+# --- เวลาเปิดเกม (--startup-trace) ---
+# แยกเวลาตั้งแต่เริ่ม import จนเฟรมแรกขึ้นจอเป็นช่วง ๆ: import / init / โหลด asset / ฟอนต์ / วาดเฟรมแรก
+# เกิดครั้งเดียวตอนเปิดเกม จึงจดทุกครั้งไม่ต้องมีสวิตช์ (พิมพ์ออกเฉพาะตอนขอ)
+class StartupTrace:
+    def __init__(self, origin=None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.phases = []  # (ชื่อ, วินาที) ตามลำดับที่เกิด
+
+    def add(self, name, seconds):
+        self.phases.append((name, seconds))
+
+    def record(self, name, start, end):
+        self.add(name, end - start)
+
+    def span(self, name):
+        return _Span(self, name)
+
+    def report(self, end=None):
+        total = (time.perf_counter() if end is None else end) - self.origin
+        rest = total - sum(s for _, s in self.phases)
+        lines = [f"เปิดเกมจนเฟรมแรกขึ้นจอ: {total * 1000.0:.1f} ms"]
+        for name, s in self.phases + [("อื่น ๆ", rest)]:
+            share = s / total * 100.0 if total > 0 else 0.0
+            lines.append(f"  {name:<24} {s * 1000.0:8.1f} ms  {share:5.1f}%")
+        return "\n".join(lines)
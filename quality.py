@@ -0,0 +1,82 @@
+from collections import deque
+
+# --- ปรับคุณภาพภาพอัตโนมัติตามเวลาเฟรม (quality governor) ---
+# จับเวลาทำงานของเฟรมล่าสุด ๆ ถ้าเฉลี่ยเกินงบ (เช่น 16.6 ms ที่ 60 FPS) ลดคุณภาพลงทีละขั้น
+# ถ้าเหลือเวลาเยอะพอติดกันนาน ๆ ค่อยเพิ่มกลับทีละขั้น
+# เกณฑ์ลด/เพิ่มห่างกัน และต้องรอนานกว่าจะเพิ่มกลับ (hysteresis) จะได้ไม่สลับไปมาทุกวินาที
+#
+# ทุกขั้นเปลี่ยนแค่การวาด ไม่แตะการจำลอง (พาร์ติเคิลยังเกิดครบ แค่วาดไม่ครบ)
+# ผลการเล่น/replay จึงเหมือนเดิมไม่ว่าเครื่องจะช้าแค่ไหน
+
+# burst_cap = วาดพาร์ติเคิลไม่เกินกี่ตัวต่อการระเบิดหนึ่งครั้ง (None = ทั้งหมด)
+# star_layers = วาดดาวกี่ชั้น (เริ่มตัดจากชั้นไกลสุด)
+# hud_every = อัพเดตตัวเลข HUD ทุกกี่เฟรม
+TIERS = [
+    {"name": "high", "burst_cap": None, "star_layers": 3, "hud_every": 1},
+    {"name": "medium", "burst_cap": 8, "star_layers": 3, "hud_every": 2},
+    {"name": "low", "burst_cap": 5, "star_layers": 2, "hud_every": 4},
+    {"name": "lowest", "burst_cap": 3, "star_layers": 1, "hud_every": 8},
+]
+
+
+def tier_index(value):
+    # รับเลขขั้นหรือชื่อขั้น ("low")
+    names = [t["name"] for t in TIERS]
+    if str(value) in names:
+        return names.index(str(value))
+    index = int(value)
+    if not 0 <= index < len(TIERS):
+        raise ValueError(f"ไม่มีระดับคุณภาพ {value} (มี 0-{len(TIERS) - 1} หรือ {', '.join(names)})")
+    return index
+
+
+class QualityGovernor:
+    def __init__(self, budget=1/60, window=30, down_at=1.0, up_at=0.6, up_after=180):
+        self.budget = budget      # วินาทีต่อเฟรม
+        self.window = deque(maxlen=window)
+        self.down_at = down_at    # เฉลี่ยเกิน budget * down_at = ลดขั้น
+        self.up_at = up_at        # เฉลี่ยต่ำกว่า budget * up_at = นับว่าเหลือเวลา
+        self.up_after = up_after  # ต้องเหลือเวลาติดกันกี่เฟรมถึงเพิ่มขั้น
+        self.tier = 0             # 0 = ดีสุด
+        self.pinned = False
+        self.calm = 0
+        self.changes = 0
+
+    @property
+    def settings(self):
+        return TIERS[self.tier]
+
+    def pin(self, tier):
+        # ล็อกขั้นไว้ (ไว้ใช้วัดผล) ; None = กลับไปปรับอัตโนมัติ
+        self.pinned = tier is not None
+        if tier is not None:
+            self.set_tier(tier_index(tier))
+
+    def set_tier(self, tier):
+        if tier != self.tier:
+            self.tier = tier
+            self.changes += 1
+        self.window.clear()
+        self.calm = 0
+
+    def record(self, frame_time):
+        # ส่งเวลาทำงานของเฟรม (ไม่รวมเวลานอนรอ) ; คืน True ถ้าเปลี่ยนขั้น
+        if self.pinned:
+            return False
+        window = self.window
+        window.append(frame_time)
+        if len(window) < window.maxlen:
+            return False
+        mean = sum(window) / len(window)
+        tier = self.tier
+        if mean > self.budget * self.down_at and tier < len(TIERS) - 1:
+            self.set_tier(tier + 1)
+            return True
+        if mean < self.budget * self.up_at and tier > 0:
+            self.calm += 1
+            if self.calm >= self.up_after:
+                self.set_tier(tier - 1)
+                return True
+        else:
+            self.calm = 0
+        return False
@@ -0,0 +1,175 @@
+import struct
+
+# --- ไฟล์ replay (seed + อินพุตทุกรอบจำลอง) ---
+# เกมจำลองแบบ deterministic อยู่แล้ว รู้ seed กับอินพุตของทุกรอบก็เล่นซ้ำได้ผลเดิมเป๊ะ
+# เขียนต่อท้ายไฟล์ไปเรื่อย ๆ ระหว่างเล่น ถือไว้ในหน่วยความจำแค่ช่วงอินพุตล่าสุดช่วงเดียว
+#
+# รูปแบบไฟล์ (little-endian):
+#   หัวไฟล์   b"CSRP" | version u8 | sim_hz u16 | seed u64
+#   ช่วงอินพุต  run varint (>0) | flags u8 | dx zigzag varint | dy zigzag varint
+#              = อินพุตเดิมซ้ำ run รอบ ตำแหน่งเล็งเก็บเป็นส่วนต่างจากช่วงก่อน
+#   ท้ายไฟล์   0 varint | ticks varint | score varint | level varint | sha1 ของสถานะสุดท้าย 20 ไบต์
+# ไฟล์ที่ไม่มีท้ายไฟล์ (เกมปิดกลางทาง) ยังเล่นซ้ำได้ แค่ไม่มีค่าให้ตรวจ
+
+MAGIC = b"CSRP"
+VERSION = 1
+HEADER = struct.Struct("<4sBHQ")
+
+LEFT = 1
+RIGHT = 2
+UP = 4
+DOWN = 8
+FIRE = 16
+FIRE_UP = 32
+AIM_MOUSE = 64  # โหมดเล็งด้วยเมาส์ (ปุ่ม M) ไม่มีผลกับการจำลอง เก็บไว้ดูย้อนหลัง
+PAUSED = 128    # มีการพักเกมก่อนรอบนี้
+
+
+class ReplayError(Exception):
+    pass
+
+
+def write_varint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def zigzag(n):
+    return n * 2 if n >= 0 else -n * 2 - 1
+
+
+def unzigzag(n):
+    return n >> 1 if not n & 1 else -(n >> 1) - 1
+
+
+def input_flags(inp):
+    return ((LEFT if inp.left else 0) | (RIGHT if inp.right else 0)
+            | (UP if inp.up else 0) | (DOWN if inp.down else 0)
+            | (FIRE if inp.fire else 0) | (FIRE_UP if inp.fire_up else 0))
+
+
+def input_fields(flags):
+    # กลับจาก flags เป็นอาร์กิวเมนต์ของ InputState
+    return {
+        "left": bool(flags & LEFT), "right": bool(flags & RIGHT),
+        "up": bool(flags & UP), "down": bool(flags & DOWN),
+        "fire": bool(flags & FIRE), "fire_up": bool(flags & FIRE_UP),
+    }
+
+
+class ReplayWriter:
+    def __init__(self, path, seed, sim_hz):
+        self.path = path
+        self.f = open(path, "wb")
+        self.f.write(HEADER.pack(MAGIC, VERSION, sim_hz, seed))
+        self.flags = None
+        self.aim = (0, 0)
+        self.run = 0
+        self.last_aim = (0, 0)  # ตำแหน่งเล็งของช่วงที่เขียนลงไฟล์ไปแล้ว
+        self.pending = 0        # บิตที่จะติดไปกับรอบถัดไป (เช่น PAUSED)
+        self.ticks = 0
+
+    def note_pause(self):
+        self.pending |= PAUSED
+
+    def record(self, inp, aim_mouse=True):
+        flags = input_flags(inp) | (AIM_MOUSE if aim_mouse else 0) | self.pending
+        self.pending = 0
+        # ตำแหน่งเล็งมีผลเฉพาะตอนคลิกยิง ตอนไม่ยิงใช้ค่าเดิม ช่วงอินพุตจะได้ยาวขึ้น
+        aim = (int(inp.aim[0]), int(inp.aim[1])) if inp.fire else self.aim
+        self.ticks += 1
+        if flags == self.flags and aim == self.aim:
+            self.run += 1
+            return
+        self.flush_run()
+        self.flags, self.aim, self.run = flags, aim, 1
+
+    def flush_run(self):
+        if not self.run:
+            return
+        out = bytearray()
+        write_varint(out, self.run)
+        out.append(self.flags)
+        write_varint(out, zigzag(self.aim[0] - self.last_aim[0]))
+        write_varint(out, zigzag(self.aim[1] - self.last_aim[1]))
+        self.f.write(out)
+        self.last_aim = self.aim
+        self.run = 0
+
+    def close(self, score=None, level=None, digest=None):
+        # ส่งผลสุดท้ายมาด้วยเพื่อให้ตอนเล่นซ้ำตรวจได้
+        if self.f is None:
+            return
+        self.flush_run()
+        if score is not None:
+            out = bytearray()
+            write_varint(out, 0)
+            write_varint(out, self.ticks)
+            write_varint(out, score)
+            write_varint(out, level)
+            out += bytes.fromhex(digest)
+            self.f.write(out)
+        self.f.close()
+        self.f = None
+
+
+class ReplayReader:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = f.read()
+        if len(self.data) < HEADER.size:
+            raise ReplayError("ไฟล์ replay สั้นเกินไป")
+        magic, version, self.sim_hz, self.seed = HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            raise ReplayError("ไม่ใช่ไฟล์ replay")
+        if version != VERSION:
+            raise ReplayError(f"ไม่รู้จัก replay เวอร์ชัน {version}")
+        # ค่าจากท้ายไฟล์ (None = ไฟล์ไม่สมบูรณ์)
+        self.ticks = self.score = self.level = self.digest = None
+        self.truncated = False
+
+    def read_varint(self, pos):
+        data = self.data
+        n = shift = 0
+        while True:
+            if pos >= len(data):
+                raise ReplayError("ไฟล์ replay ขาดกลางทาง")
+            b = data[pos]
+            pos += 1
+            n |= (b & 0x7F) << shift
+            if b < 0x80:
+                return n, pos
+            shift += 7
+
+    def runs(self):
+        # ไล่ทีละช่วง: (จำนวนรอบ, flags, (aim_x, aim_y))
+        pos = HEADER.size
+        ax = ay = 0
+        end = len(self.data)
+        while pos < end:
+            try:
+                run, pos = self.read_varint(pos)
+                if run == 0:
+                    self.ticks, pos = self.read_varint(pos)
+                    self.score, pos = self.read_varint(pos)
+                    self.level, pos = self.read_varint(pos)
+                    if end - pos < 20:
+                        raise ReplayError("ไฟล์ replay ขาดกลางทาง")
+                    self.digest = self.data[pos:pos + 20].hex()
+                    return
+                if pos >= end:
+                    raise ReplayError("ไฟล์ replay ขาดกลางทาง")
+                flags = self.data[pos]
+                dx, pos = self.read_varint(pos + 1)
+                dy, pos = self.read_varint(pos)
+            except ReplayError:
+                # เกมปิดกลางทาง: เล่นซ้ำเท่าที่มี
+                self.truncated = True
+                self.ticks = self.score = self.level = self.digest = None
+                return
+            ax += unzigzag(dx)
+            ay += unzigzag(dy)
+            yield run, flags, (ax, ay)
+
@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import queue
+import threading
+
+# --- ที่เก็บเซฟ (high score + ประวัติทุกรอบเล่น) ---
+# ไฟล์เซฟ (JSON) เป็นดัชนีเล็ก ๆ: high score, อันดับสูงสุด top_n อันดับ, รอบล่าสุด และยอดรวม
+# ประวัติเต็มของทุกรอบต่อท้ายไฟล์ log ทีละบรรทัด (JSON lines) ไม่เคยเขียนทับกลางไฟล์
+# เมนูอ่านจากดัชนีอย่างเดียว ไม่ต้องไล่ log ทั้งไฟล์ (ไล่เฉพาะตอนดัชนีหาย/เสีย เพื่อสร้างใหม่)
+#
+# การเขียนทั้งหมดทำบนเธรดแยก เกมไม่ต้องรอดิสก์ตอนจบรอบ
+# ไฟล์เซฟเขียนลงไฟล์ชั่วคราวแล้ว rename ทับ ไฟฟ้าดับกลางทางก็ยังเหลือไฟล์เก่าที่สมบูรณ์
+# บรรทัดสุดท้ายของ log ที่เขียนค้างครึ่งบรรทัดจะถูกข้ามตอนอ่าน และหายไปตอน compact
+# log ยาวเกิน max_log_runs เมื่อไหร่ จะตัดรอบเก่าออกเหลือ keep_log_runs รอบล่าสุด
+# (ยอดรวม อันดับ และ high score อยู่ในดัชนีครบแล้ว รอบเก่าจึงไม่ต้องเก็บรายละเอียด)
+
+SAVE_FILE = "cute_shooter_save.json"
+LOG_FILE = "cute_shooter_runs.log"
+
+
+def atomic_write(path, data):
+    # data เป็น str (ข้อความ utf-8) หรือ bytes ก็ได้
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data.encode("utf-8") if isinstance(data, str) else data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def read_log(path):
+    # คืนลิสต์ run ที่อ่านได้ ข้ามบรรทัดเสีย (เช่นเขียนค้างตอนเกมดับ)
+    runs = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    run = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(run, dict) and "score" in run:
+                    runs.append(run)
+    except OSError:
+        pass
+    return runs
+
+
+class SaveStore:
+    def __init__(self, path=SAVE_FILE, log_path=LOG_FILE, top_n=10, recent_n=5,
+                 max_log_runs=2000, keep_log_runs=1000):
+        self.path = path
+        self.log_path = log_path
+        self.top_n = top_n
+        self.recent_n = recent_n
+        self.max_log_runs = max_log_runs
+        self.keep_log_runs = keep_log_runs
+        self.queue = queue.Queue()
+        self.thread = None
+        self.data = self.load()
+
+    # --- ดัชนี ---
+    def empty(self):
+        return {
+            "highscore": 0,
+            "top": [],       # [{score, level, seconds, time}] เรียงคะแนนมากไปน้อย
+            "recent": [],    # รอบล่าสุดอยู่หน้าสุด
+            "runs": 0,       # จำนวนรอบทั้งหมดที่เคยเล่น
+            "seconds": 0.0,  # เวลาเล่นรวม
+            "log_runs": 0,   # จำนวนบรรทัดใน log ตอนนี้
+        }
+
+    def load(self):
+        data = None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            pass
+        if not isinstance(data, dict):
+            # ไม่มีดัชนี หรือไฟล์เสีย: สร้างใหม่จาก log (ถ้ามี) แทนที่จะรีเซ็ตสถิติเป็น 0
+            return self.rebuild()
+        merged = self.empty()
+        merged.update(data)
+        if "log_runs" not in data and "top" not in data:
+            # ไฟล์เซฟแบบเก่ามีแค่ highscore
+            merged["highscore"] = int(data.get("highscore", 0) or 0)
+        return merged
+
+    def rebuild(self):
+        data = self.empty()
+        for run in read_log(self.log_path):
+            self.add_to_index(data, run)
+        data["log_runs"] = data["runs"]
+        return data
+
+    def add_to_index(self, data, run):
+        data["runs"] += 1
+        data["seconds"] = round(data["seconds"] + run.get("seconds", 0.0), 2)
+        data["highscore"] = max(data["highscore"], run["score"])
+        data["recent"] = ([run] + data["recent"])[:self.recent_n]
+        top = data["top"]
+        if len(top) < self.top_n or run["score"] > top[-1]["score"]:
+            top.append(run)
+            top.sort(key=lambda r: r["score"], reverse=True)
+            del top[self.top_n:]
+
+    # --- ใช้จากเกม ---
+    @property
+    def highscore(self):
+        return self.data["highscore"]
+
+    def top(self, n=None):
+        return self.data["top"][:n or self.top_n]
+
+    def recent(self):
+        return self.data["recent"]
+
+    def record_run(self, score, level, seconds):
+        # บันทึกหนึ่งรอบเล่น: อัพเดตดัชนีในหน่วยความจำทันที แล้วส่งงานเขียนไฟล์ให้เธรดเขียน
+        run = {"score": score, "level": level, "seconds": round(seconds, 2),
+               "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        data = self.data
+        self.add_to_index(data, run)
+        data["log_runs"] += 1
+        # งานเขียนทำตามลำดับในคิว ตอน compact log จึงมีรอบนี้เป็นบรรทัดสุดท้ายพอดี
+        compact = data["log_runs"] > self.max_log_runs
+        if compact:
+            data["log_runs"] = self.keep_log_runs
+        self.submit(("run", json.dumps(run, ensure_ascii=False), compact))
+        self.submit(("index", json.dumps(data, ensure_ascii=False, indent=2)))
+        return run
+
+    def write_file(self, path, data):
+        # เขียนไฟล์อื่น ๆ (เช่น quicksave) แบบ atomic บนเธรดเดียวกัน ลำดับงานจึงไม่สลับกัน
+        self.submit(("file", path, data))
+
+    def remove_file(self, path):
+        self.submit(("remove", path))
+
+    # --- เธรดเขียน ---
+    def submit(self, job):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._work, name="save-writer", daemon=True)
+            self.thread.start()
+        self.queue.put(job)
+
+    def flush(self):
+        # รอจนงานเขียนที่ค้างอยู่เสร็จ
+        if self.thread is not None:
+            self.queue.join()
+
+    def close(self):
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+
+    def _work(self):
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    return
+                if job[0] == "run":
+                    self.append_run(job[1], job[2])
+                elif job[0] == "index":
+                    atomic_write(self.path, job[1])
+                elif job[0] == "file":
+                    atomic_write(job[1], job[2])
+                elif os.path.exists(job[1]):
+                    os.remove(job[1])
+            except OSError as e:
+                print("เขียนไฟล์เซฟไม่ได้:", e)
+            finally:
+                self.queue.task_done()
+
+    def append_run(self, line, compact):
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if compact:
+            self.compact_log()
+
+    def compact_log(self):
+        # เก็บไว้ keep_log_runs รอบล่าสุด แล้วเขียนทับแบบ atomic
+        runs = read_log(self.log_path)
+        keep = runs[-self.keep_log_runs:]
+        atomic_write(self.log_path, "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in keep))
@@ -0,0 +1,209 @@
+import struct
+from collections import deque
+
+import numpy as np
+
+# --- สแนปช็อตสถานะเกมแบบไบนารี (quicksave / ย้อนเวลา) ---
+# เก็บทุกอย่างที่การจำลองใช้: ผู้เล่น ศัตรู กระสุน ไอเทม พาร์ติเคิล ดาว คะแนน ตัวจับเวลา และตัวสุ่มทั้งสองตัว
+# โหลดกลับแล้วเดินเกมต่อได้ผลเหมือนไม่เคยหยุด (state_digest ตรงกันทุกรอบ)
+# array ของ numpy เขียนด้วย tobytes ตรง ๆ ไม่ต้องแปลงทีละตัว เร็วพอจะถ่ายทุกไม่กี่รอบจำลอง
+#
+# รูปแบบ (little-endian):
+#   หัว      b"CSSN" | version u8 | sim_hz u16
+#   เกม      state u8 | มี seed u8 | seed u64 | score i64 | level i64 | ticks i64
+#            | spawn_timer f64 | spawn_cd f64 | time_played f64
+#   ตัวสุ่ม   random.Random: 625 x u32 | มี gauss u8 | gauss f64
+#   ผู้เล่น   บิต int u8 | x, y, prev_x, prev_y f64 | hp i32 | shoot_cd, invuln, power_triple f64
+#   ที่เก็บ    (ศัตรู กระสุน ไอเทม ตามลำดับ) count u32 | แต่ละ field ตามลำดับที่ประกาศ [:count].tobytes()
+#   พาร์ติเคิล count u32 | จำนวนสี u16 | สี rgb u8 x3 ... | PCG64 state, inc u128 | has_uint32 u8 | uinteger u32
+#              | x, y, px, py, vx, vy, life, size, color, rank [:count]
+#   ดาว      จำนวนชั้น u8 | offsets f64 ... | ต่อชั้น: จำนวนดาว u16 | (x, y, size) i16 ...
+
+MAGIC = b"CSSN"
+VERSION = 1
+HEADER = struct.Struct("<4sBH")
+GAME = struct.Struct("<BBQqqqddd")
+GAUSS = struct.Struct("<Bd")
+PLAYER = struct.Struct("<Bddddiddd")
+PCG = struct.Struct("<16s16sBI")
+U32 = struct.Struct("<I")
+U16 = struct.Struct("<H")
+U8 = struct.Struct("<B")
+
+STATES = ["menu", "playing", "pause", "gameover"]
+PARTICLE_FIELDS = ["x", "y", "px", "py", "vx", "vy", "life", "size", "color", "rank"]
+# ค่าของผู้เล่นที่ตอนเริ่มเป็น int (ต้องคืนเป็น int ด้วย ไม่งั้น state_digest เพี้ยน)
+PLAYER_NUMBERS = ["x", "y", "prev_x", "prev_y"]
+
+
+class SnapshotError(Exception):
+    pass
+
+
+class Reader:
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def unpack(self, st):
+        if self.pos + st.size > len(self.data):
+            raise SnapshotError("สแนปช็อตขาดกลางทาง")
+        values = st.unpack_from(self.data, self.pos)
+        self.pos += st.size
+        return values
+
+    def array(self, dtype, count):
+        dtype = np.dtype(dtype)
+        end = self.pos + dtype.itemsize * count
+        if end > len(self.data):
+            raise SnapshotError("สแนปช็อตขาดกลางทาง")
+        arr = np.frombuffer(self.data[self.pos:end], dtype=dtype)
+        self.pos = end
+        return arr
+
+
+# --- เขียน ---
+def save_state(game):
+    out = [HEADER.pack(MAGIC, VERSION, game.sim_hz)]
+    seed = game.seed
+    out.append(GAME.pack(STATES.index(game.state), seed is not None, seed or 0,
+                         game.score, game.level, game.ticks,
+                         game.spawn_timer, game.spawn_cd, game.time_played))
+
+    _, internal, gauss = game.rng.getstate()
+    out.append(np.array(internal, dtype="<u4").tobytes())
+    out.append(GAUSS.pack(gauss is not None, gauss or 0.0))
+
+    p = game.player
+    int_bits = sum(1 << i for i, name in enumerate(PLAYER_NUMBERS) if isinstance(getattr(p, name), int))
+    out.append(PLAYER.pack(int_bits, p.x, p.y, p.prev_x, p.prev_y, p.hp, p.shoot_cd, p.invuln, p.power_triple))
+
+    for store in (game.enemies, game.bullets, game.powerups):
+        n = len(store)
+        out.append(U32.pack(n))
+        for name in store.fields:
+            out.append(getattr(store, name)[:n].tobytes())
+
+    parts = game.particles
+    n = len(parts)
+    out.append(U32.pack(n))
+    out.append(U16.pack(len(parts.palette)))
+    out.append(bytes(c for color in parts.palette for c in color))
+    st = parts.np_rng.bit_generator.state
+    out.append(PCG.pack(st["state"]["state"].to_bytes(16, "little"), st["state"]["inc"].to_bytes(16, "little"),
+                        st["has_uint32"], st["uinteger"]))
+    for name in PARTICLE_FIELDS:
+        out.append(getattr(parts, name)[:n].tobytes())
+
+    stars = game.stars
+    out.append(U8.pack(len(stars.offsets)))
+    out.append(np.array(stars.offsets, dtype="<f8").tobytes())
+    for layer in stars.stars:
+        out.append(U16.pack(len(layer)))
+        out.append(np.array(layer, dtype="<i2").reshape(-1, 3).tobytes())
+    return b"".join(out)
+
+
+# --- อ่าน ---
+def load_state(game, data):
+    # เขียนทับสถานะของ game ที่มีอยู่ (array ที่จองไว้แล้วใช้ต่อ)
+    r = Reader(data)
+    magic, version, sim_hz = r.unpack(HEADER)
+    if magic != MAGIC:
+        raise SnapshotError("ไม่ใช่ไฟล์สแนปช็อต")
+    if version != VERSION:
+        raise SnapshotError(f"ไม่รู้จักสแนปช็อตเวอร์ชัน {version}")
+    if sim_hz != game.sim_hz:
+        raise SnapshotError(f"สแนปช็อตนี้จำลองที่ {sim_hz} Hz แต่เกมตั้งไว้ {game.sim_hz} Hz")
+
+    state, has_seed, seed, score, level, ticks, spawn_timer, spawn_cd, time_played = r.unpack(GAME)
+    internal = tuple(r.array("<u4", 625).tolist())
+    has_gauss, gauss = r.unpack(GAUSS)
+    int_bits, *player = r.unpack(PLAYER)
+
+    stores = []
+    for store in (game.enemies, game.bullets, game.powerups):
+        n = r.unpack(U32)[0]
+        stores.append((store, n, [r.array(dtype, n) for dtype in store.fields.values()]))
+
+    parts = game.particles
+    n_parts = r.unpack(U32)[0]
+    n_colors = r.unpack(U16)[0]
+    palette = [tuple(c) for c in r.array("u1", n_colors * 3).reshape(-1, 3).tolist()]
+    pcg_state, pcg_inc, has_uint32, uinteger = r.unpack(PCG)
+    particle_arrays = [r.array(getattr(parts, name).dtype, n_parts) for name in PARTICLE_FIELDS]
+
+    n_layers = r.unpack(U8)[0]
+    offsets = r.array("<f8", n_layers).tolist()
+    layers = []
+    for _ in range(n_layers):
+        count = r.unpack(U16)[0]
+        layers.append([tuple(s) for s in r.array("<i2", count * 3).reshape(-1, 3).tolist()])
+
+    # อ่านครบแล้วค่อยเขียนทับ ไฟล์เสียกลางทางจะไม่ทิ้งเกมไว้ครึ่ง ๆ
+    game.state = STATES[state]
+    game.seed = seed if has_seed else None
+    game.score, game.level, game.ticks = score, level, ticks
+    game.spawn_timer, game.spawn_cd, game.time_played = spawn_timer, spawn_cd, time_played
+    game.rng.setstate((3, internal, gauss if has_gauss else None))
+
+    p = game.player
+    for i, name in enumerate(PLAYER_NUMBERS):
+        value = player[i]
+        setattr(p, name, int(value) if int_bits & (1 << i) else value)
+    p.hp, p.shoot_cd, p.invuln, p.power_triple = player[4:]
+    p.rect.center = (p.x, p.y)
+
+    for store, n, arrays in stores:
+        store.clear()
+        while store.capacity < n:
+            store.grow()
+        for name, arr in zip(store.fields, arrays):
+            getattr(store, name)[:n] = arr
+        store.count = n
+
+    if parts.palette[:len(palette)] != palette:
+        # สีคนละชุดกับที่อบสไปรท์ไว้ เริ่มตารางสีใหม่
+        parts.palette, parts.palette_index, parts.sprites = [], {}, []
+    for color in palette:
+        parts.color_id(color)
+    n = min(n_parts, parts.capacity)
+    for name, arr in zip(PARTICLE_FIELDS, particle_arrays):
+        getattr(parts, name)[:n] = arr[:n]
+    parts.count = n
+    parts.np_rng.bit_generator.state = {
+        "bit_generator": "PCG64",
+        "state": {"state": int.from_bytes(pcg_state, "little"), "inc": int.from_bytes(pcg_inc, "little")},
+        "has_uint32": has_uint32, "uinteger": uinteger,
+    }
+
+    game.stars.restore(layers, offsets)
+
+
+# --- ย้อนเวลา ---
+class RewindBuffer:
+    # เก็บสแนปช็อตทุก every รอบจำลอง ย้อนได้ไกลสุด seconds วินาที (เก่ากว่านั้นทิ้ง)
+    def __init__(self, sim_hz, every=6, seconds=10.0):
+        self.every = every
+        self.step = every / sim_hz  # วินาทีระหว่างสแนปช็อต
+        self.frames = deque(maxlen=max(1, int(seconds / self.step)))
+
+    def __len__(self):
+        return len(self.frames)
+
+    def clear(self):
+        self.frames.clear()
+
+    def tick(self, game):
+        if game.ticks % self.every == 0:
+            self.frames.append(save_state(game))
+
+    def rewind(self, game, seconds):
+        # กลับไปสแนปช็อตที่ห่างจากล่าสุดประมาณ seconds วินาที (หรือเก่าสุดที่มี) ; คืน False ถ้าไม่มีให้ย้อน
+        if not self.frames:
+            return False
+        back = min(len(self.frames), max(1, round(seconds / self.step)))
+        for _ in range(back - 1):
+            self.frames.pop()
+        load_state(game, self.frames[-1])
+        return True
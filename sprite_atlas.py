@@ -0,0 +1,45 @@
+import pygame
+
+# --- แคชสไปรท์ที่อบไว้ล่วงหน้า ---
+# รูปทรงที่เคยวาดด้วย pygame.draw หลายคำสั่งต่อเฟรม จะถูกวาดลง Surface ครั้งเดียว
+# ต่อ key (เช่น ศัตรูรัศมี 18 สีชมพู) แล้วเฟรมต่อ ๆ ไปแค่ blit ทีเดียว
+# ตัวแอตลาสไม่รู้จักรูปทรงเอง ผู้เรียกส่งฟังก์ชัน paint(surf, cx, cy, *args) มาให้อบ
+
+COLORKEY = (1, 2, 3)
+
+
+class SpriteAtlas:
+    def __init__(self, colorkey=COLORKEY):
+        self.colorkey = colorkey
+        self.sprites = {}
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def clear(self):
+        self.sprites.clear()
+
+    def bake(self, size, anchor, paint, *args):
+        img = pygame.Surface(size)
+        img.fill(self.colorkey)
+        paint(img, anchor[0], anchor[1], *args)
+        if pygame.display.get_surface() is not None:
+            img = img.convert()
+        img.set_colorkey(self.colorkey)
+        return img
+
+    def get(self, key, size, anchor, paint, *args):
+        # คืน (surface, anchor) ; anchor คือจุดในสไปรท์ที่ตรงกับตำแหน่งของวัตถุ
+        entry = self.sprites.get(key)
+        if entry is None:
+            entry = (self.bake(size, anchor, paint, *args), anchor)
+            self.sprites[key] = entry
+        return entry
+
+    def item(self, key, x, y, size, anchor, paint, *args):
+        # คู่ (surface, ตำแหน่งมุมซ้ายบน) พร้อมส่งเข้า Surface.blits
+        entry = self.sprites.get(key)
+        if entry is None:
+            entry = self.get(key, size, anchor, paint, *args)
+        img, (ax, ay) = entry
+        return img, (int(x) - ax, int(y) - ay)
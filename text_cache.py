@@ -0,0 +1,59 @@
+import time
+from collections import OrderedDict
+
+import pygame
+
+# --- แคชฟอนต์และข้อความที่เรนเดอร์แล้ว ---
+# โหลดไฟล์ฟอนต์ที่แนบมากับเกมครั้งเดียวต่อขนาด และเก็บ Surface ของข้อความ
+# ที่เคยเรนเดอร์ไว้ใน LRU ข้อความ HUD ที่ค่าไม่เปลี่ยนจึงไม่ต้องเรนเดอร์ใหม่ทุกเฟรม
+
+
+class TextCache:
+    def __init__(self, font_file, fallback="THSarabunNew", capacity=256):
+        self.font_file = font_file
+        self.fallback = fallback
+        self.capacity = capacity
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.load_time = 0.0  # วินาทีที่ใช้เปิดฟอนต์ทั้งหมด (SysFont ครั้งแรกต้องไล่รายชื่อฟอนต์ทั้งเครื่อง)
+
+    def font(self, size, bold=False):
+        key = (size, bold)
+        f = self.fonts.get(key)
+        if f is None:
+            start = time.perf_counter()
+            if not pygame.font.get_init():
+                pygame.font.init()
+            f = None
+            if self.font_file:
+                try:
+                    f = pygame.font.Font(self.font_file, size)
+                    f.set_bold(bold)
+                except OSError as e:
+                    # ไม่เจอไฟล์ฟอนต์ก็ถอยไปใช้ฟอนต์ระบบแบบเดิม (แจ้งครั้งเดียวพอ)
+                    print("โหลดฟอนต์ไม่สำเร็จ ใช้ฟอนต์ระบบแทน:", e)
+                    self.font_file = None
+            if f is None:
+                f = pygame.font.SysFont(self.fallback, size, bold=bold)
+            self.fonts[key] = f
+            self.load_time += time.perf_counter() - start
+        return f
+
+    def render(self, text, size, color, bold=False):
+        key = (text, size, tuple(color), bold)
+        img = self.surfaces.get(key)
+        if img is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return img
+        self.misses += 1
+        img = self.font(size, bold).render(text, True, color)
+        self.surfaces[key] = img
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return img
+
+    def clear(self):
+        self.surfaces.clear()
@@ -0,0 +1,117 @@
+import os
+import weakref
+
+import pygame
+
+try:
+    from pygame._sdl2.video import Window, Renderer, Texture
+except ImportError:  # pygame เก่า/บิลด์ที่ไม่มี _sdl2
+    Window = Renderer = Texture = None
+
+# --- ตัววาดแบบ texture (--renderer texture) ---
+# แทนที่จะวาดลง Surface ของ display.set_mode แล้ว flip ทั้งจอ ทุกสไปรท์/ข้อความ/ชั้นดาว
+# ถูกอัพโหลดเป็น Texture ครั้งแรกที่ใช้ แล้วเฟรมต่อ ๆ ไปแค่สั่ง copy (SDL รวมคำสั่งเป็นชุดเดียวต่อเฟรมให้)
+# เกมวาดที่ความละเอียดตรรกะคงที่ (WIDTH x HEIGHT) เสมอ ส่วนหน้าต่างปรับขนาดได้อิสระ
+# SDL ย่อ/ขยายให้เองและเติมขอบดำถ้าสัดส่วนไม่ตรง ตำแหน่งเมาส์แปลงกลับด้วย to_logical()
+#
+# TextureScreen มี blit/blits แบบเดียวกับ Surface โค้ดวาดของเกมจึงใช้ได้ทั้งสองทาง
+# software=True ใช้ตัววาดซอฟต์แวร์ของ SDL (เครื่องไม่มี GPU / รีโมตเดสก์ท็อป)
+#
+# ข้อตกลง: Surface ที่ส่งมาวาดต้องไม่ถูกแก้หลังวาดครั้งแรก (สไปรท์ในแอตลาส ข้อความในแคช ชั้นดาว
+# ล้วนอบครั้งเดียว) Texture ผูกกับตัว Surface แบบ weak ref หายไปเองเมื่อ Surface ถูกทิ้ง (เช่นข้อความหลุด LRU)
+
+
+def available():
+    return Renderer is not None
+
+
+class TextureScreen:
+    def __init__(self, logical_size, window_size=None, title="", software=False, vsync=False):
+        if Renderer is None:
+            raise pygame.error("pygame นี้ไม่มี pygame._sdl2 ใช้ตัววาดแบบ texture ไม่ได้")
+        # ให้ SDL รวมคำสั่ง copy ของทั้งเฟรมเป็นชุดเดียว (ค่าเริ่มต้นเปิดอยู่แล้วถ้าไม่ได้ระบุไดรเวอร์เอง)
+        os.environ.setdefault("SDL_RENDER_BATCHING", "1")
+        self.size = tuple(logical_size)
+        self.window = Window(title, size=tuple(window_size or logical_size), resizable=True)
+        self.renderer = Renderer(self.window, accelerated=0 if software else -1, vsync=vsync)
+        self.renderer.logical_size = self.size
+        self.renderer.draw_color = (0, 0, 0, 255)  # ขอบดำตอนสัดส่วนหน้าต่างไม่ตรง
+        self.textures = weakref.WeakKeyDictionary()  # Surface -> Texture
+        self.uploads = 0
+
+    def get_size(self):
+        return self.size
+
+    def texture(self, img):
+        tex = self.textures.get(img)
+        if tex is None:
+            tex = Texture.from_surface(self.renderer, img)
+            self.textures[img] = tex
+            self.uploads += 1
+        return tex
+
+    # --- แบบเดียวกับ Surface ---
+    def blit(self, img, dest, area=None, special_flags=0):
+        tex = self.texture(img)
+        x, y = dest[0], dest[1]
+        if area is None:
+            tex.draw(None, (x, y, tex.width, tex.height))
+        else:
+            area = pygame.Rect(area)
+            tex.draw(area, (x, y, area.w, area.h))
+
+    def blits(self, seq, doreturn=True):
+        # ลำดับ (Surface, ตำแหน่ง[, area]) ; สไปรท์ชุดเดียวกันมักมาติดกัน จำ texture ตัวล่าสุดไว้
+        last = tex = None
+        w = h = 0
+        for item in seq:
+            img = item[0]
+            if img is not last:
+                last = img
+                tex = self.texture(img)
+                w, h = tex.width, tex.height
+            pos = item[1]
+            if len(item) > 2 and item[2] is not None:
+                area = pygame.Rect(item[2])
+                tex.draw(area, (pos[0], pos[1], area.w, area.h))
+            else:
+                tex.draw(None, (pos[0], pos[1], w, h))
+
+    def set_clip(self, rect):
+        # ตัววาดนี้วาดเต็มจอทุกเฟรม (ไม่มีโหมด dirty rect) ไม่ต้องตัดขอบ
+        pass
+
+    # --- เฟรม ---
+    def clear(self):
+        self.renderer.clear()
+
+    def present(self):
+        self.renderer.present()
+
+    def to_logical(self, pos):
+        # ตำแหน่งเมาส์บนหน้าต่าง -> พิกัดในเกม (อีเวนต์ของเมาส์ SDL แปลงให้แล้ว แต่ mouse.get_pos ไม่แปลง)
+        sx, sy = self.renderer.scale
+        view = self.renderer.get_viewport()
+        return int(pos[0] / sx) - view.x, int(pos[1] / sy) - view.y
+
+    def output_rect(self):
+        # ส่วนของหน้าต่าง (พิกเซลจริง) ที่เกมถูกย่อ/ขยายลงไป ไม่รวมขอบดำ
+        ww, wh = self.window.size
+        lw, lh = self.size
+        scale = min(ww / lw, wh / lh)
+        w, h = max(1, int(lw * scale)), max(1, int(lh * scale))
+        return pygame.Rect((ww - w) // 2, (wh - h) // 2, w, h)
+
+    def snapshot(self):
+        # ภาพที่วาดไว้ในเฟรมนี้เป็น Surface ขนาดตรรกะ ; ต้องเรียกก่อน present
+        # to_surface() ของ pygame คิดกรอบเป็นพิกัดตรรกะแต่ SDL อ่านเป็นพิกเซลจริง หน้าต่างที่ย่อ/ขยายจะอ่านผิดที่
+        # จึงปิดการย่อ/ขยายชั่วคราว อ่านทั้งหน้าต่าง ตัดขอบดำ แล้วค่อยย่อกลับเป็นขนาดตรรกะ
+        rect = self.output_rect()
+        if rect.size == self.size and rect.topleft == (0, 0):
+            return self.renderer.to_surface()
+        self.renderer.logical_size = (0, 0)
+        try:
+            surf = self.renderer.to_surface().subsurface(rect)
+        finally:
+            self.renderer.logical_size = self.size
+        return pygame.transform.smoothscale(surf, self.size)